@@ -44,7 +44,6 @@ CLASSIFIERS = [
 INSTALL_REQUIRES = [
     "aprslib>=0.7.2",
     "apprise>=1.9.4",
-    "expiringdict>=1.2.2",
     "unidecode>=1.4.0",
     "apscheduler>=3.11.0",
 ]
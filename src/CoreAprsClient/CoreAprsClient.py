@@ -28,7 +28,7 @@ from pprint import pformat
 from collections.abc import Callable
 from typing import Dict, Any, Mapping
 import threading
-import copy
+import re
 from types import MappingProxyType
 
 from . import client_shared
@@ -38,14 +38,25 @@ from .client_utils import (
     client_exception_handler,
     handle_exception,
     check_for_default_config,
-    finalize_pretty_aprs_messages,
-    make_pretty_aprs_messages,
+    get_formatted_aprs_messages,
+    get_formatted_reply_cache_statistics,
+    get_formatted_static_aprs_messages,
+    CoreAprsClientStaticMessage,
+    stream_pretty_aprs_messages,
     generate_apprise_message,
+    build_full_pathname,
+    get_transliteration_cache_statistics,
+    build_formatting_profile,
 )
 from .client_configuration import load_config, program_config
 from .client_aprsobject import APRSISObject
-from .client_message_counter import APRSMessageCounter
+from .client_message_counter import (
+    APRSMessageCounter,
+    APRS_MESSAGE_COUNTER_MAX_DESTINATIONS,
+)
+from .client_state_file import APRSStateFile
 from .client_expdict import create_expiring_dict
+from .client_pagination import APRSContinuationStore
 from .client_aprs_communication import (
     aprs_callback,
     init_scheduler_jobs,
@@ -106,7 +117,13 @@ class CoreAprsClient:
         self.pre_processor = pre_processor
         self.post_processor = post_processor
         self.log_level = log_level
-        self._dynamic_aprs_bulletins: Dict[str, Any] = {}
+        # Copy-on-write store for the dynamic aprs bulletins: version,
+        # immutable snapshot and schedule settings are published together via
+        # a single reference swap. Readers never lock; writers serialize via
+        # self._lock
+        self._dynamic_aprs_bulletins: tuple[
+            int, Mapping[str, Any], Mapping[str, tuple]
+        ] = (0, MappingProxyType({}), MappingProxyType({}))
         self._lock = threading.Lock()
 
         # Prepare the config file handler
@@ -126,6 +143,9 @@ class CoreAprsClient:
         # Currently, we do not abort the code but only issue an error to the user
         check_for_default_config()
 
+        # Build the formatting settings for our outgoing messages
+        client_shared.formatting_profile = build_formatting_profile()
+
         # Finally, create the MappingProxyType copy of the configuration
         # so that we can expose it to the user, if requested.
         self._config_data = MappingProxyType(program_config.copy())
@@ -172,21 +192,100 @@ class CoreAprsClient:
             sys.exit(0)
 
         #
-        # Read the message counter
+        # Open the memory-mapped state file
+        client_shared.aprs_state_file = APRSStateFile(
+            file_name=build_full_pathname(
+                file_name=program_config["coac_data_storage"]["aprs_state_file_name"],
+                relative_path_name=program_config["coac_data_storage"][
+                    "aprs_data_directory"
+                ],
+            ),
+            slots=APRS_MESSAGE_COUNTER_MAX_DESTINATIONS,
+        )
+
+        #
+        # Read the message counter and start writing its changes
+        # to disk in the background
         client_shared.aprs_message_counter = APRSMessageCounter(
-            file_name=program_config["coac_data_storage"][
-                "aprs_message_counter_file_name"
+            state_file=client_shared.aprs_state_file,
+            legacy_file_name=build_full_pathname(
+                file_name=program_config["coac_data_storage"][
+                    "aprs_message_counter_file_name"
+                ]
+            ),
+            fsync=program_config["coac_data_storage"]["aprs_message_counter_fsync"],
+            alphabet=program_config["coac_data_storage"][
+                "aprs_message_number_alphabet"
+            ],
+            length=program_config["coac_data_storage"]["aprs_message_number_length"],
+            per_destination=program_config["coac_data_storage"][
+                "aprs_message_number_per_destination"
+            ],
+        )
+        client_shared.aprs_message_counter.start_flusher(
+            interval_seconds=program_config["coac_data_storage"][
+                "aprs_message_counter_flush_interval"
             ]
         )
 
         # Create the APRS-IS dupe message cache
+        # If requested, the cache is shared with all other processes on this
+        # host which use the same call sign
+        _shared_memory_name = None
+        _lock_file_name = None
+        if program_config["coac_dupe_detection"]["msg_cache_shared_memory"]:
+            _callsign = program_config["coac_client_config"]["aprsis_callsign"]
+            _shared_memory_name = "coac_" + re.sub(r"[^A-Za-z0-9]", "_", _callsign)
+            _lock_file_name = build_full_pathname(
+                file_name=f"{_shared_memory_name}.lock",
+                relative_path_name=program_config["coac_data_storage"][
+                    "aprs_data_directory"
+                ],
+            )
         client_shared.aprs_message_cache = create_expiring_dict(
             max_len=program_config["coac_dupe_detection"]["msg_cache_max_entries"],
             max_age_seconds=program_config["coac_dupe_detection"][
                 "msg_cache_time_to_live"
             ],
+            shared_memory_name=_shared_memory_name,
+            lock_file_name=_lock_file_name,
         )
 
+        # Restore the dupe message cache from its most recent snapshot
+        # and start writing new snapshots in the background
+        aprs_message_cache_file_name = build_full_pathname(
+            file_name=program_config["coac_data_storage"][
+                "aprs_message_cache_file_name"
+            ],
+            relative_path_name=program_config["coac_data_storage"][
+                "aprs_data_directory"
+            ],
+        )
+        client_shared.aprs_message_cache.read_snapshot(
+            file_name=aprs_message_cache_file_name
+        )
+        client_shared.aprs_message_cache.start_snapshots(
+            file_name=aprs_message_cache_file_name,
+            interval_seconds=program_config["coac_dupe_detection"][
+                "msg_cache_snapshot_interval"
+            ],
+        )
+
+        # Create the store for the remaining pages of paginated responses
+        # (if the user has enabled pagination)
+        client_shared.aprs_continuation_store = None
+        if program_config["coac_pagination"]["pagination_enabled"]:
+            client_shared.aprs_continuation_store = APRSContinuationStore(
+                page_size=program_config["coac_pagination"]["pagination_page_size"],
+                more_keyword=program_config["coac_pagination"][
+                    "pagination_more_keyword"
+                ],
+                max_entries=program_config["coac_pagination"]["pagination_max_entries"],
+                max_age_seconds=program_config["coac_pagination"][
+                    "pagination_time_to_live"
+                ],
+            )
+
         # Register the SIGTERM handler; this will allow a safe shutdown of the program
         logger.debug(msg="Registering SIGTERM handler for safe shutdown...")
         signal.signal(signal.SIGTERM, signal_term_handler)
@@ -222,6 +321,10 @@ class CoreAprsClient:
                 # Are we connected?
                 if client_shared.AIS.ais_is_connected():
                     logger.debug(msg="Established the connection to APRS-IS")
+                    with client_shared.aprs_state_file.locked():
+                        client_shared.aprs_state_file.set_value(
+                            "last_connect_time", time.time()
+                        )
 
                     # Install the APRS-IS beacon / bulletin schedulers if
                     # activated in the program's configuration file
@@ -262,6 +365,10 @@ class CoreAprsClient:
                     logger.debug(msg="Closing APRS connection to APRS-IS")
                     client_shared.AIS.ais_close()
                     client_shared.AIS = None
+                    with client_shared.aprs_state_file.locked():
+                        client_shared.aprs_state_file.set_value(
+                            "last_disconnect_time", time.time()
+                        )
                 else:
                     logger.debug(msg="Cannot re-establish connection to APRS-IS")
 
@@ -279,7 +386,15 @@ class CoreAprsClient:
             )
 
             # write most recent APRS message counter to disk
-            client_shared.aprs_message_counter.write_counter()
+            client_shared.aprs_message_counter.stop_flusher()
+            client_shared.aprs_state_file.close()
+
+            # write the final dupe message cache snapshot to disk, then
+            # release the cache (e.g. detach from its shared memory block)
+            client_shared.aprs_message_cache.stop_snapshots(
+                file_name=aprs_message_cache_file_name
+            )
+            client_shared.aprs_message_cache.close()
 
             # Shutdown (and remove) the scheduler if it still exists
             if aprs_scheduler:
@@ -318,6 +433,9 @@ class CoreAprsClient:
             )
             sys.exit(0)
 
+        # Build the formatting settings for our outgoing messages
+        client_shared.formatting_profile = build_formatting_profile()
+
         # Register the on_exit function to be called on program exit
         atexit.register(client_exception_handler)
 
@@ -343,14 +461,12 @@ class CoreAprsClient:
                             msg="Received positive pre-processor response; preparing for premature APRS send_msg"
                         )
 
-                        # prepare the outgoing message
-                        preproc_message = make_pretty_aprs_messages(
-                            message_to_add=pre_processor_response_string
-                        )
-
-                        # And finalize the output message, if needed
-                        preproc_message = finalize_pretty_aprs_messages(
-                            mylistarray=preproc_message
+                        # prepare and finalize the outgoing message
+                        preproc_message = list(
+                            get_formatted_aprs_messages(
+                                message_to_add=pre_processor_response_string,
+                                formatting_profile=client_shared.formatting_profile,
+                            )
                         )
 
                         # Dump the data to the console
@@ -405,24 +521,44 @@ class CoreAprsClient:
                     logger.info(
                         "Output generator status successful; building outgoing messages ..."
                     )
-                    # Convert to pretty APRS messaging
-                    output_message = make_pretty_aprs_messages(
-                        message_to_add=output_message_string
-                    )
-
-                    # And finalize the output message, if needed
-                    output_message = finalize_pretty_aprs_messages(
-                        mylistarray=output_message
-                    )
+                    if isinstance(output_message_string, CoreAprsClientStaticMessage):
+                        # static content, e.g. a help text
+                        output_message = list(
+                            get_formatted_static_aprs_messages(
+                                message_to_add=output_message_string,
+                                formatting_profile=client_shared.formatting_profile,
+                            )
+                        )
+                    elif isinstance(output_message_string, str):
+                        # Convert to pretty APRS messaging and finalize
+                        # the output message, if needed
+                        output_message = list(
+                            get_formatted_aprs_messages(
+                                message_to_add=output_message_string,
+                                formatting_profile=client_shared.formatting_profile,
+                            )
+                        )
+                    else:
+                        # Streaming output generator; collect its (already
+                        # finalized) APRS messages
+                        output_message = list(
+                            stream_pretty_aprs_messages(
+                                message_chunks=output_message_string,
+                                formatting_profile=client_shared.formatting_profile,
+                            )
+                        )
                 else:
                     logger.info("Output generator status unsuccessful")
                     # This code branch should never be reached unless there is a
                     # discrepancy between the action determined by the input parser
                     # and the responsive counter-action in the output processor
-                    output_message = make_pretty_aprs_messages(
-                        message_to_add=program_config["coac_client_config"][
-                            "aprs_input_parser_default_error_message"
-                        ],
+                    output_message = list(
+                        get_formatted_static_aprs_messages(
+                            message_to_add=program_config["coac_client_config"][
+                                "aprs_input_parser_default_error_message"
+                            ],
+                            formatting_profile=client_shared.formatting_profile,
+                        )
                     )
                 logger.info(msg=pformat(output_message))
 
@@ -453,23 +589,26 @@ class CoreAprsClient:
                     msg="input_parser_error_message = {input_parser_error_message}"
                 )
                 # Dump the human-readable message to the user if we have one
+                # If not, just dump the link to the instructions
+                # The outgoing message(s) are finalized, meaning that message
+                # numbers are added if the user has requested this in his
+                # configuration settings
                 if input_parser_error_message:
-                    output_message = make_pretty_aprs_messages(
-                        message_to_add=f"{input_parser_error_message}",
+                    output_message = list(
+                        get_formatted_static_aprs_messages(
+                            message_to_add=f"{input_parser_error_message}",
+                            formatting_profile=client_shared.formatting_profile,
+                        )
                     )
-                # If not, just dump the link to the instructions
                 else:
-                    output_message = make_pretty_aprs_messages(
-                        message_to_add=program_config["coac_client_config"][
-                            "aprs_input_parser_default_error_message"
-                        ],
+                    output_message = list(
+                        get_formatted_static_aprs_messages(
+                            message_to_add=program_config["coac_client_config"][
+                                "aprs_input_parser_default_error_message"
+                            ],
+                            formatting_profile=client_shared.formatting_profile,
+                        )
                     )
-                # Ultimately, finalize the outgoing message(s) and add the message
-                # numbers if the user has requested this in his configuration
-                # settings
-                output_message = finalize_pretty_aprs_messages(
-                    mylistarray=output_message
-                )
 
                 logger.info(pformat(output_message))
                 logger.info(msg=pformat(response_parameters))
@@ -485,11 +624,10 @@ class CoreAprsClient:
         Returns
         =======
         dynamic_aprs_bulletins: Mapping[str, Any]
-            immutable copy of the dynamic aprs bulletins' 'dict' object
+            immutable snapshot of the dynamic aprs bulletins' 'dict' object
         """
 
-        with self._lock:
-            return MappingProxyType(self._dynamic_aprs_bulletins)
+        return self._dynamic_aprs_bulletins[1]
 
     @dynamic_aprs_bulletins.setter
     def dynamic_aprs_bulletins(self, new_dict: Dict[str, Any]) -> None:
@@ -507,7 +645,255 @@ class CoreAprsClient:
 
         """
         with self._lock:
-            self._dynamic_aprs_bulletins = copy.deepcopy(new_dict)
+            # a full replacement also discards all schedule settings
+            self._publish_dynamic_aprs_bulletins(new_bulletins=dict(new_dict))
+
+    def update_dynamic_aprs_bulletin(
+        self,
+        key: str,
+        value: str,
+        ttl_minutes: float | None = None,
+        interval_minutes: float | None = None,
+    ) -> None:
+        """
+        Adds or replaces a single dynamic aprs bulletin
+
+        Parameters
+        ==========
+        key: str
+            bulletin identifier, e.g. 'BLN0'
+        value: str
+            bulletin text
+        ttl_minutes: float | None
+            life span of the bulletin (unit of measure = minutes). Expired
+            bulletins are removed automatically. None = no expiry
+        interval_minutes: float | None
+            repeat interval of the bulletin (unit of measure = minutes).
+            None = use the regular bulletin interval
+            (aprsis_bulletin_interval_minutes)
+
+        Returns
+        =======
+
+        """
+        if ttl_minutes is not None and ttl_minutes <= 0:
+            raise ValueError("ttl_minutes must be greater than zero")
+        if interval_minutes is not None and interval_minutes <= 0:
+            raise ValueError("interval_minutes must be greater than zero")
+
+        schedule_entry = (
+            time.monotonic() + ttl_minutes * 60 if ttl_minutes else None,
+            interval_minutes * 60 if interval_minutes else None,
+        )
+        with self._lock:
+            _, current_bulletins, current_schedule = self._dynamic_aprs_bulletins
+            current_entry = current_schedule.get(key, (None, None))
+            # The expiry time is based on the current time and thus never
+            # matches. An update with the same text and interval only
+            # renews the bulletin's life span; it is not a change
+            unchanged = (
+                key in current_bulletins
+                and current_bulletins[key] == value
+                and current_entry[1] == schedule_entry[1]
+            )
+            if unchanged and current_entry[0] == schedule_entry[0]:
+                return
+            new_bulletins = dict(current_bulletins)
+            new_bulletins[key] = value
+            new_schedule = dict(current_schedule)
+            if schedule_entry == (None, None):
+                new_schedule.pop(key, None)
+            else:
+                new_schedule[key] = schedule_entry
+            self._publish_dynamic_aprs_bulletins(
+                new_bulletins=new_bulletins,
+                new_schedule=new_schedule,
+                increase_version=not unchanged,
+            )
+
+    def remove_dynamic_aprs_bulletin(self, key: str) -> bool:
+        """
+        Removes a single dynamic aprs bulletin
+
+        Parameters
+        ==========
+        key: str
+            bulletin identifier, e.g. 'BLN0'
+
+        Returns
+        =======
+        success: bool
+            True if the bulletin has been removed, False if it did not exist
+        """
+        with self._lock:
+            _, current_bulletins, current_schedule = self._dynamic_aprs_bulletins
+            if key not in current_bulletins:
+                return False
+            new_bulletins = dict(current_bulletins)
+            del new_bulletins[key]
+            new_schedule = dict(current_schedule)
+            new_schedule.pop(key, None)
+            self._publish_dynamic_aprs_bulletins(
+                new_bulletins=new_bulletins, new_schedule=new_schedule
+            )
+        return True
+
+    def remove_expired_dynamic_aprs_bulletins(self) -> int:
+        """
+        Removes all dynamic aprs bulletins whose life span has expired
+
+        Parameters
+        ==========
+
+        Returns
+        =======
+        expired: int
+            number of removed bulletins
+        """
+        now = time.monotonic()
+
+        # lock-free check first as there is usually nothing to do
+        if not any(
+            expires_at is not None and expires_at <= now
+            for expires_at, _ in self._dynamic_aprs_bulletins[2].values()
+        ):
+            return 0
+
+        with self._lock:
+            _, current_bulletins, current_schedule = self._dynamic_aprs_bulletins
+            expired_keys = [
+                key
+                for key, (expires_at, _) in current_schedule.items()
+                if expires_at is not None and expires_at <= now
+            ]
+            if not expired_keys:
+                return 0
+            logger.debug(msg=f"Removing expired dynamic bulletins {expired_keys}")
+            new_bulletins = dict(current_bulletins)
+            new_schedule = dict(current_schedule)
+            for key in expired_keys:
+                new_bulletins.pop(key, None)
+                del new_schedule[key]
+            self._publish_dynamic_aprs_bulletins(
+                new_bulletins=new_bulletins, new_schedule=new_schedule
+            )
+        return len(expired_keys)
+
+    def _publish_dynamic_aprs_bulletins(
+        self,
+        new_bulletins: Dict[str, Any],
+        new_schedule: Dict[str, tuple] | None = None,
+        increase_version: bool = True,
+    ) -> None:
+        """
+        Publishes a new snapshot of the dynamic aprs bulletins. The caller
+        must hold self._lock and must not keep references to 'new_bulletins'
+        and 'new_schedule'
+
+        Parameters
+        ==========
+        new_bulletins: Dict[str, Any]
+            private copy of the new dynamic aprs bulletins
+        new_schedule: Dict[str, tuple] | None
+            private copy of the new bulletins' schedule settings
+            (key -> (expiry time, interval in seconds)). None = no settings
+        increase_version: bool
+            True = the bulletins have changed and need to be compiled again.
+            False = only the expiry times have changed
+
+        Returns
+        =======
+
+        """
+        version = self._dynamic_aprs_bulletins[0]
+        if increase_version:
+            version += 1
+        self._dynamic_aprs_bulletins = (
+            version,
+            MappingProxyType(new_bulletins),
+            MappingProxyType(new_schedule or {}),
+        )
+
+    @property
+    def dynamic_aprs_bulletins_version(self) -> int:
+        """
+        'getter' for the version of the dynamic aprs bulletins. The version
+        is increased whenever new dynamic aprs bulletins are assigned,
+        thus telling the bulletin scheduler that it has to recompile
+        its bulletins
+
+        Parameters
+        ==========
+
+        Returns
+        =======
+        dynamic_aprs_bulletins_version: int
+            version of the dynamic aprs bulletins
+        """
+        return self._dynamic_aprs_bulletins[0]
+
+    @property
+    def dynamic_aprs_bulletins_snapshot(
+        self,
+    ) -> tuple[int, Mapping[str, Any], Mapping[str, tuple]]:
+        """
+        'getter' for the version, the dynamic aprs bulletins and their
+        schedule settings. All values are read at once and thus always
+        belong together
+
+        Parameters
+        ==========
+
+        Returns
+        =======
+        dynamic_aprs_bulletins_version: int
+            version of the dynamic aprs bulletins
+        dynamic_aprs_bulletins: Mapping[str, Any]
+            immutable snapshot of the dynamic aprs bulletins' 'dict' object
+        dynamic_aprs_bulletins_schedule: Mapping[str, tuple]
+            schedule settings of the dynamic aprs bulletins. Key = bulletin
+            identifier, Value = (expiry time, interval in seconds); the expiry
+            time is based on time.monotonic(). Bulletins without
+            settings are not part of this mapping
+        """
+        return self._dynamic_aprs_bulletins
+
+    @property
+    def metrics(self) -> Mapping[str, Any]:
+        """
+        'getter' for the client's runtime metrics
+
+        Parameters
+        ==========
+
+        Returns
+        =======
+        metrics: Mapping[str, Any]
+            immutable snapshot of the client's runtime metrics, e.g.
+            the dupe message cache statistics ('dupe_cache'), the
+            transliteration cache statistics ('transliteration_cache'), the
+            formatted reply cache statistics ('formatted_reply_cache') and
+            the compaction statistics ('compaction', if enabled)
+        """
+        metrics: Dict[str, Any] = {}
+        if client_shared.aprs_message_cache is not None:
+            metrics["dupe_cache"] = MappingProxyType(
+                client_shared.aprs_message_cache.get_statistics()
+            )
+        metrics["transliteration_cache"] = MappingProxyType(
+            get_transliteration_cache_statistics()
+        )
+        metrics["formatted_reply_cache"] = MappingProxyType(
+            get_formatted_reply_cache_statistics()
+        )
+        if (
+            client_shared.formatting_profile
+            and client_shared.formatting_profile.compactor
+        ):
+            metrics["compaction"] = MappingProxyType(
+                client_shared.formatting_profile.compactor.get_statistics()
+            )
+        return MappingProxyType(metrics)
 
     @property
     def config_data(self) -> Mapping[str, Any]:
@@ -1,2 +1,3 @@
 from .CoreAprsClient import CoreAprsClient
 from .client_return_codes import CoreAprsClientInputParserStatus
+from .client_utils import CoreAprsClientStaticMessage
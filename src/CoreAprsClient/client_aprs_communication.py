@@ -19,27 +19,41 @@
 #
 
 import time
-import types
 
 from .client_configuration import program_config
 from .client_utils import (
-    make_pretty_aprs_messages,
-    get_aprs_message_from_cache,
-    add_aprs_message_to_cache,
+    get_formatted_aprs_messages,
+    get_formatted_static_aprs_messages,
+    CoreAprsClientStaticMessage,
+    get_aprs_message_cache_key,
     parse_bulletin_data,
+    APRSBulletinFrames,
     finalize_pretty_aprs_messages,
+    stream_pretty_aprs_messages,
 )
 from ._version import __version__
 from .client_aprsobject import APRSISObject
+from .client_bulletin_scheduler import (
+    APRSBulletinScheduler,
+    APRS_BULLETIN_SCHEDULER_TICK_SECONDS,
+)
+from .client_transmit_queue import (
+    APRSTransmitQueue,
+    APRS_PACING_BEACON,
+    APRS_PACING_BULLETIN,
+)
+from .client_message_counter import (
+    APRSMessageCounter,
+    APRS_REPLYACK_MESSAGE_NUMBER_LENGTH,
+)
 from . import client_shared
 from .client_logger import logger
 from .client_return_codes import CoreAprsClientInputParserStatus
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.schedulers import base as apbase
-import copy
 import re
 from collections.abc import Callable
-from typing import Any, Iterable
+from typing import Any, Iterable, Sized
 
 APRS_MSG_LEN_NOTRAILING = 67
 
@@ -98,10 +112,10 @@ def send_ack(
 
 def send_aprs_message_list(
     myaprsis: APRSISObject,
-    message_text_array: list,
+    message_text_array: Iterable[str],
     destination_call_sign: str,
     send_with_msg_no: bool,
-    aprs_message_counter: int,
+    aprs_message_counter: APRSMessageCounter,
     external_message_number: str,
     source_callsign: str,
     tocall: str,
@@ -118,7 +132,7 @@ def send_aprs_message_list(
     ==========
     myaprsis: aprslib.inet.IS
         Our aprslib object that we will use for the communication part
-    message_text_array: list
+    message_text_array: Iterable[str]
         Contains 1..n entries of the content that we want to send to the user
     destination_call_sign: str
         Target user call sign that is going to receive the message (usually, this
@@ -126,8 +140,10 @@ def send_aprs_message_list(
     send_with_msg_no: bool
         If True, each outgoing message will have its own message ID attached to the outgoing content
         If False, no message ID is added
-    aprs_message_counter: int
-        message_counter for messages that require to be ack'ed
+    aprs_message_counter: APRSMessageCounter
+        message counter for messages that require to be ack'ed. The message
+        numbers are reserved atomically, meaning that concurrent senders
+        never use the same message numbers
     simulate_send: bool
         If True: Prepare string but only send it to logger
     external_message_number: str
@@ -157,12 +173,29 @@ def send_aprs_message_list(
 
     Returns
     =======
-    aprs_message_counter: int
-        new value for message_counter for messages that require to be ack'ed
     """
 
-    # Send our message list
-    for index, single_message in enumerate(message_text_array, start=1):
+    # Reserve the message numbers for the whole message list in one go.
+    # Streams do not know their length in advance; for these, we reserve
+    # the message numbers one by one
+    first_counter = None
+    if send_with_msg_no and isinstance(message_text_array, Sized):
+        if len(message_text_array) == 0:
+            return
+        first_counter = aprs_message_counter.allocate(
+            count=len(message_text_array), destination=destination_call_sign
+        )
+
+    # Send our message list. The list can also be a stream of messages (see
+    # stream_pretty_aprs_messages), so we wait for the regular sleep cycle
+    # right before sending the next message. Time which has passed while
+    # the next message was being generated counts towards that delay
+    last_send_time = None
+    for index, single_message in enumerate(message_text_array):
+        if last_send_time is not None:
+            remaining_delay = packet_delay - (time.monotonic() - last_send_time)
+            if remaining_delay > 0:
+                time.sleep(remaining_delay)
         # Build the output string
         stringtosend = (
             f"{source_callsign}>{tocall}::{destination_call_sign:9}:{single_message}"
@@ -172,70 +205,52 @@ def send_aprs_message_list(
         # us to honor this behavior with our OUTGOING message by adding a message no)?
         if send_with_msg_no:
             # Build the alphanumeric message number
-            alpha_counter = get_alphanumeric_counter_value(aprs_message_counter)
+            if first_counter is None:
+                message_counter = aprs_message_counter.allocate(
+                    count=1, destination=destination_call_sign
+                )
+            else:
+                message_counter = first_counter + index
+            # The reply-ack format only permits 2 character message numbers
+            alpha_counter = aprs_message_counter.get_message_number(
+                counter=message_counter,
+                length=(
+                    APRS_REPLYACK_MESSAGE_NUMBER_LENGTH if new_ackrej_format else None
+                ),
+            )
             stringtosend = stringtosend + "{" + alpha_counter
             if new_ackrej_format:
                 stringtosend = stringtosend + "}" + external_message_number[:2]
-            aprs_message_counter = aprs_message_counter + 1
-            # reset the message number if we have exceeded the maximum count
-            if (
-                aprs_message_counter > 676 or alpha_counter == "ZZ"
-            ):  # for the alphanumeric counter AA..ZZ, this is equal to "ZZ"
-                aprs_message_counter = 0
         # Check if we need to send the message for real or have to simulate it
         if not simulate_send:
             logger.debug(msg=f"Sending response message '{stringtosend}'")
             myaprsis.ais_send(aprsis_data=stringtosend)
         else:
             logger.debug(msg=f"Simulating response message '{stringtosend}'")
-        # Apply the regular sleep cycle if there are still messages to be sent
-        # Otherwise, use the shorter sleep cycle
-        if index < len(message_text_array):
-            time.sleep(packet_delay)
-        else:
-            time.sleep(packet_delay_grace_period)
-    return aprs_message_counter
-
-
-def get_alphanumeric_counter_value(numeric_counter: int):
-    """
-    Calculate an alphanumeric
-    Parameters
-    ==========
-    numeric_counter: int
-        numeric counter that is used for calculating the start value
-    Returns
-    =======
-    alphanumeric_counter: str
-        alphanumeric counter that is based on the numeric counter
-        Range from AA to ZZ
-    """
-    first_char = int(numeric_counter / 26)
-    second_char = int(numeric_counter % 26)
-    alphanumeric_counter = chr(first_char + 65) + chr(second_char + 65)
-    return alphanumeric_counter
+        last_send_time = time.monotonic()
+    # Apply the shorter sleep cycle after the very last message
+    if last_send_time is not None:
+        time.sleep(packet_delay_grace_period)
 
 
 def send_beacon_and_status_msg(
     class_instance: object,
-    myaprsis: APRSISObject,
+    transmit_queue: APRSTransmitQueue,
     aprs_beacon_messages: list,
-    simulate_send: bool = True,
 ):
     """
-    Send beacon message list to APRS_IS
-    If 'simulate_send'= True, we still prepare the message but only send it to our log file
+    Hands the beacon message list over to the transmit queue which
+    sends them to APRS_IS. Returns right away.
 
     Parameters
     ==========
     class_instance: object
         Instance of the main class
-    myaprsis: APRSISObject
-        Our aprslib object that we will use for the communication part
+    transmit_queue: APRSTransmitQueue
+        The outbound queue which sends the beacons and applies the
+        beacon delays
     aprs_beacon_messages: list
         List of pre-defined APRS beacon messages
-    simulate_send: bool
-        If True: Prepare string but only send it to logger
 
     Returns
     =======
@@ -248,131 +263,61 @@ def send_beacon_and_status_msg(
     _aprsis_callsign = program_config["coac_client_config"]["aprsis_callsign"]
     _aprsis_tocall = program_config["coac_client_config"]["aprsis_tocall"]
 
-    # Build and send the list of beacons
-    for index, bcn in enumerate(aprs_beacon_messages, start=1):
-        # build the beacon string
-        stringtosend = f"{_aprsis_callsign}>{_aprsis_tocall}:{bcn}"
-        # simulate sending yes/no
-        if not simulate_send:
-            logger.debug(msg=f"Sending beacon: {stringtosend}")
-            # send the beacon to APRS-IS
-            myaprsis.ais_send(aprsis_data=stringtosend)
-        else:
-            logger.debug(msg=f"Simulating beacons: {stringtosend}")
-        # apply sleep cycle(s)
-        # do we still have messages in our queue?
-        # Yes, apply the regular beacon sleep cycle
-        if index < len(aprs_beacon_messages):
-            time.sleep(program_config["coac_message_delay"]["packet_delay_beacon"])
-        else:
-            # Otherwise, apply the shorter sleep cycle after sending out
-            # our very last beacon message
-            time.sleep(
-                program_config["coac_message_delay"]["packet_delay_grace_period"]
-            )
+    # Build the list of beacons and queue it
+    transmit_queue.enqueue(
+        frames=[
+            f"{_aprsis_callsign}>{_aprsis_tocall}:{bcn}" for bcn in aprs_beacon_messages
+        ],
+        pacing_class=APRS_PACING_BEACON,
+    )
 
 
 def send_bulletin_messages(
     class_instance: object,
-    myaprsis: APRSISObject,
-    bulletin_dict: dict,
-    simulate_send: bool = True,
+    transmit_queue: APRSTransmitQueue,
+    bulletin_scheduler: APRSBulletinScheduler,
 ):
     """
-    Sends bulletin message list to APRS_IS
+    Hands the due bulletin messages over to the transmit queue which
+    sends them to APRS_IS. Returns right away.
     'Recipient' is 'BLNxxx' and is predefined in the bulletin's dict 'key'. The actual message
     itself is stored in the dict's 'value'.
-    If 'simulate_send'= True, we still prepare the message but only send it to our log file
 
     Parameters
     ==========
     class_instance: object
         Instance of the main class
-    myaprsis: APRSISObject
-        Our aprslib object that we will use for the communication part
-    bulletin_dict: dict
-        The bulletins that we are going to send upt to the user. Key = BLNxxx, Value = Bulletin Text
-    simulate_send: bool
-        If True: Prepare string but only send it to logger
+    transmit_queue: APRSTransmitQueue
+        The outbound queue which sends the bulletins and applies the
+        bulletin delays
+    bulletin_scheduler: APRSBulletinScheduler
+        The schedule of the compiled bulletins that we are going to send
+        to the user. The user's dynamic bulletins are only recompiled if
+        they have changed
 
     Returns
     =======
     none
     """
-    logger.debug(msg="reached bulletin interval; sending bulletins")
-
-    # create our target dictionary which may contain both static
-    # and dynamic bulletin messages. First, copy the content from the static
-    # bulletin settings - we don't need to check this data again.
-    target_dict = copy.deepcopy(bulletin_dict)
-
-    if type(class_instance.dynamic_aprs_bulletins) is types.MappingProxyType:
-        # Get the key and value from our configuration file's bulletin messages section
-        for key, value in class_instance.dynamic_aprs_bulletins.items():
-            # Message populated and less than max APRS message length?
-            # note: we do not use message enumeration for bulletins
-            # therefore, the max length requirement is always fixed (67 bytes)
-            if 0 < len(value) <= APRS_MSG_LEN_NOTRAILING:
-                # Check if the identifier follows these APRS requirements:
-                # 1) must start with fixed "BLN" string OR "NWS-" string
-                # 2) needs to be followed by 1..6 (NWS: 1..5) ASCII-7 characters and/or digits
-                # We do not need to look for "finalized" entries, read: the dictionary's key is
-                # not required to have keys with 9 chars in total length
-                match = re.match(
-                    pattern=r"^(bln[a-z0-9]{1,6})|(nws-[a-z0-9]{1,5})$",
-                    string=key,
-                    flags=re.IGNORECASE,
-                )
-                if match:
-                    # We found a match. As a precaution, let's check if the user has
-                    # used characters in the actual message which are special to APRS
-                    match = re.findall(r"[{}|~]+", value)
-                    if match:
-                        logger.debug(
-                            msg=f"APRS dynamic bulletin message '{key}': removing special APRS characters from 'value' setting"
-                        )
-                        # Let's get rid of those control characters from the message
-                        value = re.sub(r"[{}|~]+", "", value)
-                    # Convert the bulletin identifier to upperkey
-                    key = key.upper()
-                    # and add it to our dictionary in case it does not exist
-                    # and its lenght (after potential character replacements)
-                    # is still greater than zero
-                    if key not in target_dict and len(value) > 0:
-                        target_dict[key] = value
-            else:
-                logger.debug(
-                    f"Ignoring dynamic bulletin setting for '{key}'; value is either empty or exceeds {APRS_MSG_LEN_NOTRAILING} characters. Check your input data"
-                )
+    # Drop the user's expired dynamic bulletins
+    class_instance.remove_expired_dynamic_aprs_bulletins()
+
+    # Get the due ready-to-send bulletin frames, consisting of both static
+    # and dynamic bulletin messages. Version, dynamic bulletins and their
+    # schedule are retrieved as one snapshot and thus always belong together
+    version, dynamic_bulletins, schedule = (
+        class_instance.dynamic_aprs_bulletins_snapshot
+    )
+    bulletins = bulletin_scheduler.get_due_frames(
+        version=version, dynamic_bulletins=dynamic_bulletins, schedule=schedule
+    )
+    if not bulletins:
+        return
 
-    # Generate some local variables because the 'black' beautifier seems
-    # to choke on multi-dimensional dictionaries
-    _aprsis_callsign = program_config["coac_client_config"]["aprsis_callsign"]
-    _aprsis_tocall = program_config["coac_client_config"]["aprsis_tocall"]
+    logger.debug(msg="reached bulletin interval; sending bulletins")
 
-    # Build and send the list of bulletins
-    # Note that we iterate over the unified dictionary of APRS bulletins
-    for index, (recipient_id, bln) in enumerate(target_dict.items(), start=1):
-        # build the bulletin string
-        stringtosend = f"{_aprsis_callsign}>{_aprsis_tocall}::{recipient_id:9}:{bln}"
-        # simulate sending yes/no
-        if not simulate_send:
-            logger.debug(msg=f"Sending bulletin: {stringtosend}")
-            # send the bulletin to APRS-IS
-            myaprsis.ais_send(aprsis_data=stringtosend)
-        else:
-            logger.debug(msg=f"simulating bulletins: {stringtosend}")
-        # apply sleep cycle(s)
-        # do we still have messages in our queue?
-        # Yes, apply the regular bulletin sleep cycle
-        if index < len(bulletin_dict):
-            time.sleep(program_config["coac_message_delay"]["packet_delay_bulletin"])
-        else:
-            # Otherwise, apply the shorter sleep cycle after sending out
-            # our very last bulletin message
-            time.sleep(
-                program_config["coac_message_delay"]["packet_delay_grace_period"]
-            )
+    # Queue the list of bulletins
+    transmit_queue.enqueue(frames=bulletins, pacing_class=APRS_PACING_BULLETIN)
 
 
 # APRSlib callback
@@ -451,15 +396,46 @@ def aprs_callback(
             # Check if the message is present in our decaying message cache
             # If the message can be located, then we can assume that we have
             # processed (and potentially acknowledged) that message request
-            # within the last e.g. 5 minutes and that this is a delayed / dupe
-            # request, thus allowing us to ignore this request.
-            aprs_message_key = get_aprs_message_from_cache(
+            # within the last e.g. 5 minutes - or that we are still processing
+            # it - and that this is a delayed / dupe request, thus allowing us
+            # to ignore this request.
+            #
+            # The dupe detection key is calculated only once per packet. If
+            # the message is new, it gets claimed ('in flight') as part of the
+            # very same atomic operation so that any retransmission arriving
+            # while we are still busy with the original message never reaches
+            # the input parser.
+            is_more_request = (
+                client_shared.aprs_continuation_store is not None
+                and client_shared.aprs_continuation_store.is_more_request(
+                    message_text=message_text_string
+                )
+            )
+
+            # If the user's station does not use message numbers, all of its
+            # requests for the next page of a paginated response share the
+            # very same key, so every page but the first one would be
+            # discarded as a dupe. If there is a stored page, we send it
+            # without dupe detection. Otherwise, the request is processed
+            # (and checked for dupes) like any other request.
+            if (
+                is_more_request
+                and not msg_no_supported
+                and send_continuation_page(
+                    from_callsign=from_callsign,
+                    msg_no_supported=msg_no_supported,
+                    msgno_string=msgno_string,
+                    new_ackrej_format=new_ackrej_format,
+                )
+            ):
+                return
+
+            aprs_message_key = get_aprs_message_cache_key(
                 message_text=message_text_string,
                 message_no=msgno_string,
                 target_callsign=from_callsign,
-                aprs_cache=client_shared.aprs_message_cache,
             )
-            if aprs_message_key:
+            if client_shared.aprs_message_cache.seen_or_claim(aprs_message_key):
                 logger.debug(
                     msg="DUPLICATE APRS PACKET - this message is still in our decaying message cache"
                 )
@@ -467,220 +443,268 @@ def aprs_callback(
                     msg=f"Ignoring duplicate APRS packet raw_aprs_packet: {raw_aprs_packet}"
                 )
             else:
-                logger.debug(msg=f"Received raw_aprs_packet: {raw_aprs_packet}")
-
-                # Send an ack if we DID receive a message number
-                # and we DID NOT have received a request in the
-                # new ack/rej format
-                # see aprs101.pdf pg. 71ff.
-                if msg_no_supported and not new_ackrej_format:
-                    send_ack(
-                        myaprsis=client_shared.AIS,
-                        simulate_send=program_config["coac_testing"][
-                            "aprsis_simulate_send"
-                        ],
-                        source_callsign=program_config["coac_client_config"][
-                            "aprsis_callsign"
-                        ],
-                        tocall=program_config["coac_client_config"]["aprsis_tocall"],
-                        target_callsign=from_callsign,
-                        source_msg_no=msgno_string,
-                        packet_delay=program_config["coac_message_delay"][
-                            "packet_delay_ack"
-                        ],
-                    )
+                try:
+                    logger.debug(msg=f"Received raw_aprs_packet: {raw_aprs_packet}")
+
+                    # Send an ack if we DID receive a message number
+                    # and we DID NOT have received a request in the
+                    # new ack/rej format
+                    # see aprs101.pdf pg. 71ff.
+                    if msg_no_supported and not new_ackrej_format:
+                        send_ack(
+                            myaprsis=client_shared.AIS,
+                            simulate_send=program_config["coac_testing"][
+                                "aprsis_simulate_send"
+                            ],
+                            source_callsign=program_config["coac_client_config"][
+                                "aprsis_callsign"
+                            ],
+                            tocall=program_config["coac_client_config"][
+                                "aprsis_tocall"
+                            ],
+                            target_callsign=from_callsign,
+                            source_msg_no=msgno_string,
+                            packet_delay=program_config["coac_message_delay"][
+                                "packet_delay_ack"
+                            ],
+                        )
 
-                ###
-                ### BEGIN Pre-Processor Code
-                ###
-                # Check if the user has provided us with a pre-processor code stack
-                if preproc:
-                    logger.debug(msg="Executing preprocessor")
-                    success, pre_processor_response_message = preproc(
+                    ###
+                    ### BEGIN Pagination Code
+                    ###
+                    # Check if the user requests the next page of a paginated
+                    # response. This request is handled by the framework itself;
+                    # neither the pre-processor nor the input parser will see it.
+                    # If there is no stored response for the user, the request is
+                    # processed like any other request.
+                    if (
+                        is_more_request
+                        and msg_no_supported
+                        and send_continuation_page(
+                            from_callsign=from_callsign,
+                            msg_no_supported=msg_no_supported,
+                            msgno_string=msgno_string,
+                            new_ackrej_format=new_ackrej_format,
+                        )
+                    ):
+                        client_shared.aprs_message_cache.confirm(aprs_message_key)
+                        return
+                    ###
+                    ### END Pagination Code
+                    ###
+
+                    ###
+                    ### BEGIN Pre-Processor Code
+                    ###
+                    # Check if the user has provided us with a pre-processor code stack
+                    if preproc:
+                        logger.debug(msg="Executing preprocessor")
+                        success, pre_processor_response_message = preproc(
+                            instance,
+                            message_text_string,
+                            from_callsign,
+                            **kwargs,
+                        )
+                        logger.debug(msg=f"Preprocessor result: {success}")
+                        logger.debug(
+                            msg=f"pre_processor_response_message={pre_processor_response_message}"
+                        )
+
+                        # Now check if we have received a premature APRS message that we are supposed
+                        # to send back to the user before we enter the input parser
+                        if success and type(pre_processor_response_message) is str:
+                            if len(pre_processor_response_message) > 0:
+                                # generate the message list ...
+                                preproc_message = get_formatted_aprs_messages(
+                                    message_to_add=pre_processor_response_message,
+                                    formatting_profile=client_shared.formatting_profile,
+                                )
+
+                                # Finalize the message (if necessary), then send it
+                                # to APRS-IS
+                                finalize_and_send_message(
+                                    message_text_array=preproc_message,
+                                    from_callsign=from_callsign,
+                                    msg_no_supported=msg_no_supported,
+                                    msgno_string=msgno_string,
+                                    new_ackrej_format=new_ackrej_format,
+                                )
+
+                    ###
+                    ### END Pre-Processor Code
+                    ###
+
+                    ###
+                    ### BEGIN Input Parser Code
+                    ###
+
+                    #
+                    # This is where the magic happens: Try to figure out what the user
+                    # wants from us. If we were able to understand the user's message,
+                    # 'success' will be true. In any case, the 'response_parameters'
+                    # dictionary will give us a hint about what to do next (and even
+                    # contains the parser's error message if 'success' != True)
+                    # input parameters: the actual message, the user's call sign and
+                    # the aprs.fi API access key for location lookups
+                    #
+                    # Note: we call the function which was passed along with the
+                    # callback object
+                    retcode, input_parser_error_message, response_parameters = parser(
                         instance,
                         message_text_string,
                         from_callsign,
                         **kwargs,
                     )
-                    logger.debug(msg=f"Preprocessor result: {success}")
-                    logger.debug(
-                        msg=f"pre_processor_response_message={pre_processor_response_message}"
-                    )
-
-                    # Now check if we have received a premature APRS message that we are supposed
-                    # to send back to the user before we enter the input parser
-                    if success and type(pre_processor_response_message) is str:
-                        if len(pre_processor_response_message) > 0:
-                            # generate the message list ...
-                            preproc_message = make_pretty_aprs_messages(
-                                message_to_add=pre_processor_response_message
+                    logger.debug(msg=f"Input parser result: {retcode}")
+                    logger.debug(msg=response_parameters)
+
+                    # this is our future output message object
+                    output_message = []
+
+                    # this is our potential postprocessor input object
+                    # If its future value is not 'None' AND a post processor has been
+                    # set up for the class' object instance, then we try to run the
+                    # given post processor AFTER the output processor's message has been sent
+                    # to the user via APRS
+                    postproc_data = None
+
+                    ###
+                    ### END Input Parser Code
+                    ###
+
+                    ###
+                    ### BEGIN Output Generator Code
+                    ###
+
+                    #
+                    # parsing successful?
+                    #
+                    # We support three possible return codes from the input parser:
+                    # PARSE_OK     - Input processor has identified keyword and is ready
+                    #                to continue. This is the desired default state
+                    #                Whenever the return code is PARSE_OK, then we should know
+                    #                by now what the user wants from us. Now, we'll leave it to
+                    #                another module to generate the output data of what we want
+                    #                to send to the user (client_output_generator.py).
+                    #                The result to this post-processor will be a general success
+                    #                status code and the message that is to be sent to the user.
+                    # PARSE_ERROR  - an error has occurred. Most likely, the external
+                    #                input processor was either unable to identify a
+                    #                keyword from the message OR a follow-up process has
+                    #                failed; e.g. the user has defined a wx keyword,
+                    #                requiring the sender to supply mandatory location info
+                    #                which was missing from the message. In any way, this signals
+                    #                the callback function that we are unable to process the
+                    #                message any further
+                    # PARSE_IGNORE - The message was ok but we are being told to ignore it. This
+                    #                might be the case if the user's input processor has a dupe
+                    #                check that is additional to the one provided by the
+                    #                core-aprs-client framework. Similar to PARSE_ERROR, we
+                    #                are not permitted to process this request any further BUT
+                    #                instead of sending an error message, we will simply ignore
+                    #                the request. Note that the core-aprs-client framework has
+                    #                already ack'ed the request at this point, thus preventing it
+                    #                from getting resend by APRS-IS over and over again.
+                    #
+                    # Note that you should refrain from using PARSE_IGNORE whenever possible - a
+                    # polite inquiry should always trigger a polite response :-) Nevertheless, there
+                    # might be use cases where you simply need to ignore a (technically valid) request
+                    # in your custom code.
+                    #
+                    #
+                    match retcode:
+                        case CoreAprsClientInputParserStatus.PARSE_OK:
+                            # Generate the output message for the requested keyword
+                            #
+                            # Note: we call the function which was passed along with the
+                            # callback object
+                            success, output_string, postproc_data = generator(
+                                instance,
+                                response_parameters,
+                                **kwargs,
                             )
+                            if success and isinstance(
+                                output_string, CoreAprsClientStaticMessage
+                            ):
+                                # static content, e.g. a help text
+                                output_message = get_formatted_static_aprs_messages(
+                                    message_to_add=output_string,
+                                    formatting_profile=client_shared.formatting_profile,
+                                )
+                            elif success and isinstance(output_string, str):
+                                output_message = get_formatted_aprs_messages(
+                                    message_to_add=output_string,
+                                    formatting_profile=client_shared.formatting_profile,
+                                )
+                            elif success:
+                                # The output generator has returned an iterable
+                                # (e.g. a generator) with text chunks. Send each APRS
+                                # message as soon as it is complete
+                                output_message = stream_pretty_aprs_messages(
+                                    message_chunks=output_string,
+                                    formatting_profile=client_shared.formatting_profile,
+                                )
+                            else:
+                                # This code branch should never be reached unless there is a
+                                # discrepancy between the action determined by the input parser
+                                # and the responsive counter-action from the output processor
+                                output_message = get_formatted_static_aprs_messages(
+                                    message_to_add=program_config["coac_client_config"][
+                                        "aprs_input_parser_default_error_message"
+                                    ],
+                                    formatting_profile=client_shared.formatting_profile,
+                                )
+                        # This is the branch where the input parser failed to understand
+                        # the message. A possible reason: you sent a keyword which requires
+                        # an additional parameter but failed to send that one, too.
+                        # As we only parse but never process data in that input
+                        # parser, we simply don't know what to do with the user's message
+                        # and get back to him with a generic response.
+                        case CoreAprsClientInputParserStatus.PARSE_ERROR:
+                            # Dump the human-readable message to the user if we have one
+                            if input_parser_error_message:
+                                output_message = get_formatted_static_aprs_messages(
+                                    message_to_add=f"{input_parser_error_message}",
+                                    formatting_profile=client_shared.formatting_profile,
+                                )
+                            # If not, just dump the link to the instructions
+                            # This is the default branch which dumps generic information
+                            # to the client whenever there is no generic error text from the input parser
+                            else:
+                                output_message = get_formatted_static_aprs_messages(
+                                    message_to_add=program_config["coac_client_config"][
+                                        "aprs_input_parser_default_error_message"
+                                    ],
+                                    formatting_profile=client_shared.formatting_profile,
+                                )
+                                logger.debug(
+                                    msg=f"Unable to process APRS packet {raw_aprs_packet}"
+                                )
+                        # default branch for anything else, including PARSE_IGNORE
+                        case _:
+                            pass
+
+                    # Finalize the message (if necessary), then send it
+                    # to APRS-IS
+                    finalize_and_send_message(
+                        message_text_array=output_message,
+                        from_callsign=from_callsign,
+                        msg_no_supported=msg_no_supported,
+                        msgno_string=msgno_string,
+                        new_ackrej_format=new_ackrej_format,
+                        paginate=True,
+                    )
 
-                            # Finalize the message (if necessary), then send it
-                            # to APRS-IS
-                            finalize_and_send_message(
-                                message_text_array=preproc_message,
-                                from_callsign=from_callsign,
-                                msg_no_supported=msg_no_supported,
-                                msgno_string=msgno_string,
-                                new_ackrej_format=new_ackrej_format,
-                            )
-
-                ###
-                ### END Pre-Processor Code
-                ###
-
-                ###
-                ### BEGIN Input Parser Code
-                ###
-
-                #
-                # This is where the magic happens: Try to figure out what the user
-                # wants from us. If we were able to understand the user's message,
-                # 'success' will be true. In any case, the 'response_parameters'
-                # dictionary will give us a hint about what to do next (and even
-                # contains the parser's error message if 'success' != True)
-                # input parameters: the actual message, the user's call sign and
-                # the aprs.fi API access key for location lookups
-                #
-                # Note: we call the function which was passed along with the
-                # callback object
-                retcode, input_parser_error_message, response_parameters = parser(
-                    instance,
-                    message_text_string,
-                    from_callsign,
-                    **kwargs,
-                )
-                logger.debug(msg=f"Input parser result: {retcode}")
-                logger.debug(msg=response_parameters)
-
-                # this is our future output message object
-                output_message = []
-
-                # this is our potential postprocessor input object
-                # If its future value is not 'None' AND a post processor has been
-                # set up for the class' object instance, then we try to run the
-                # given post processor AFTER the output processor's message has been sent
-                # to the user via APRS
-                postproc_data = None
-
-                ###
-                ### END Input Parser Code
-                ###
-
-                ###
-                ### BEGIN Output Generator Code
-                ###
-
-                #
-                # parsing successful?
-                #
-                # We support three possible return codes from the input parser:
-                # PARSE_OK     - Input processor has identified keyword and is ready
-                #                to continue. This is the desired default state
-                #                Whenever the return code is PARSE_OK, then we should know
-                #                by now what the user wants from us. Now, we'll leave it to
-                #                another module to generate the output data of what we want
-                #                to send to the user (client_output_generator.py).
-                #                The result to this post-processor will be a general success
-                #                status code and the message that is to be sent to the user.
-                # PARSE_ERROR  - an error has occurred. Most likely, the external
-                #                input processor was either unable to identify a
-                #                keyword from the message OR a follow-up process has
-                #                failed; e.g. the user has defined a wx keyword,
-                #                requiring the sender to supply mandatory location info
-                #                which was missing from the message. In any way, this signals
-                #                the callback function that we are unable to process the
-                #                message any further
-                # PARSE_IGNORE - The message was ok but we are being told to ignore it. This
-                #                might be the case if the user's input processor has a dupe
-                #                check that is additional to the one provided by the
-                #                core-aprs-client framework. Similar to PARSE_ERROR, we
-                #                are not permitted to process this request any further BUT
-                #                instead of sending an error message, we will simply ignore
-                #                the request. Note that the core-aprs-client framework has
-                #                already ack'ed the request at this point, thus preventing it
-                #                from getting resend by APRS-IS over and over again.
-                #
-                # Note that you should refrain from using PARSE_IGNORE whenever possible - a
-                # polite inquiry should always trigger a polite response :-) Nevertheless, there
-                # might be use cases where you simply need to ignore a (technically valid) request
-                # in your custom code.
-                #
-                #
-                match retcode:
-                    case CoreAprsClientInputParserStatus.PARSE_OK:
-                        # Generate the output message for the requested keyword
-                        #
-                        # Note: we call the function which was passed along with the
-                        # callback object
-                        success, output_string, postproc_data = generator(
-                            instance,
-                            response_parameters,
-                            **kwargs,
-                        )
-                        if success:
-                            output_message = make_pretty_aprs_messages(
-                                message_to_add=output_string
-                            )
-                        else:
-                            # This code branch should never be reached unless there is a
-                            # discrepancy between the action determined by the input parser
-                            # and the responsive counter-action from the output processor
-                            output_message = make_pretty_aprs_messages(
-                                message_to_add=program_config["coac_client_config"][
-                                    "aprs_input_parser_default_error_message"
-                                ],
-                            )
-                    # This is the branch where the input parser failed to understand
-                    # the message. A possible reason: you sent a keyword which requires
-                    # an additional parameter but failed to send that one, too.
-                    # As we only parse but never process data in that input
-                    # parser, we simply don't know what to do with the user's message
-                    # and get back to him with a generic response.
-                    case CoreAprsClientInputParserStatus.PARSE_ERROR:
-                        # Dump the human-readable message to the user if we have one
-                        if input_parser_error_message:
-                            output_message = make_pretty_aprs_messages(
-                                message_to_add=f"{input_parser_error_message}",
-                            )
-                        # If not, just dump the link to the instructions
-                        # This is the default branch which dumps generic information
-                        # to the client whenever there is no generic error text from the input parser
-                        else:
-                            output_message = make_pretty_aprs_messages(
-                                message_to_add=program_config["coac_client_config"][
-                                    "aprs_input_parser_default_error_message"
-                                ],
-                            )
-                            logger.debug(
-                                msg=f"Unable to process APRS packet {raw_aprs_packet}"
-                            )
-                    # default branch for anything else, including PARSE_IGNORE
-                    case _:
-                        pass
-
-                # Finalize the message (if necessary), then send it
-                # to APRS-IS
-                finalize_and_send_message(
-                    message_text_array=output_message,
-                    from_callsign=from_callsign,
-                    msg_no_supported=msg_no_supported,
-                    msgno_string=msgno_string,
-                    new_ackrej_format=new_ackrej_format,
-                )
-
-                # We've finished processing this message. Update the decaying
-                # cache with our message.
-                # Store the core message data in our decaying APRS message cache
-                # Dupe detection is applied regardless of the message's
-                # processing status
-                client_shared.aprs_message_cache = add_aprs_message_to_cache(
-                    message_text=message_text_string,
-                    message_no=msgno_string,
-                    target_callsign=from_callsign,
-                    aprs_cache=client_shared.aprs_message_cache,
-                )
+                    # We've finished processing this message. Update the decaying
+                    # cache and mark our message as completed.
+                    # Dupe detection is applied regardless of the message's
+                    # processing status
+                    client_shared.aprs_message_cache.confirm(aprs_message_key)
+                except Exception:
+                    # Processing has failed; remove our claim so that a
+                    # retransmission of this message is accepted again
+                    client_shared.aprs_message_cache.release(aprs_message_key)
+                    raise
 
                 ###
                 ### END Output Generator Code
@@ -707,8 +731,9 @@ def aprs_callback(
                     if success and type(post_processor_response_message) is str:
                         if len(post_processor_response_message) > 0:
                             # generate the message list ...
-                            postproc_message = make_pretty_aprs_messages(
-                                message_to_add=post_processor_response_message
+                            postproc_message = get_formatted_aprs_messages(
+                                message_to_add=post_processor_response_message,
+                                formatting_profile=client_shared.formatting_profile,
                             )
 
                             # Finalize the message (if necessary), then send it
@@ -744,6 +769,26 @@ def init_scheduler_jobs(class_instance: object):
         # Create the scheduler
         my_scheduler = BackgroundScheduler()
 
+        # Create the outbound queue. The scheduler's jobs only add their
+        # frames to this queue; its worker thread takes care of sending
+        # them to APRS-IS and of the delays between them
+        client_shared.aprs_transmit_queue = APRSTransmitQueue(
+            myaprsis=client_shared.AIS,
+            pacing={
+                APRS_PACING_BEACON: program_config["coac_message_delay"][
+                    "packet_delay_beacon"
+                ],
+                APRS_PACING_BULLETIN: program_config["coac_message_delay"][
+                    "packet_delay_bulletin"
+                ],
+            },
+            grace_period=program_config["coac_message_delay"][
+                "packet_delay_grace_period"
+            ],
+            simulate_send=program_config["coac_testing"]["aprsis_simulate_send"],
+        )
+        client_shared.aprs_transmit_queue.start()
+
         # Install two schedulers tasks, if requested by the user
         # The first task is responsible for sending out beacon messages
         # to APRS; it will be triggered every 30 mins
@@ -835,9 +880,8 @@ def init_scheduler_jobs(class_instance: object):
             # Ultimately, send the initial beacon message
             send_beacon_and_status_msg(
                 class_instance=class_instance,
-                myaprsis=client_shared.AIS,
+                transmit_queue=client_shared.aprs_transmit_queue,
                 aprs_beacon_messages=aprs_beacon_messages,
-                simulate_send=program_config["coac_testing"]["aprsis_simulate_send"],
             )
 
             # Now let's add position beaconing to scheduler
@@ -850,9 +894,8 @@ def init_scheduler_jobs(class_instance: object):
                 ],
                 args=[
                     class_instance,
-                    client_shared.AIS,
+                    client_shared.aprs_transmit_queue,
                     aprs_beacon_messages,
-                    program_config["coac_testing"]["aprsis_simulate_send"],
                 ],
                 max_instances=1,
                 coalesce=True,
@@ -860,23 +903,41 @@ def init_scheduler_jobs(class_instance: object):
 
         if program_config["coac_bulletin_config"]["aprsis_broadcast_bulletins"]:
             # prepare the bulletin data
-            aprs_bulletin_messages = parse_bulletin_data()
+            aprs_bulletin_messages = APRSBulletinFrames(
+                static_bulletins=parse_bulletin_data(),
+                source_callsign=program_config["coac_client_config"]["aprsis_callsign"],
+                tocall=program_config["coac_client_config"]["aprsis_tocall"],
+            )
+            _aprsis_bulletin_interval_minutes = program_config["coac_bulletin_config"][
+                "aprsis_bulletin_interval_minutes"
+            ]
+            aprs_bulletin_scheduler = APRSBulletinScheduler(
+                bulletin_frames=aprs_bulletin_messages,
+                interval_minutes=_aprsis_bulletin_interval_minutes,
+                send_on_change=program_config["coac_bulletin_config"][
+                    "aprsis_bulletin_send_on_change"
+                ],
+                initial_repeat_minutes=program_config["coac_bulletin_config"][
+                    "aprsis_bulletin_initial_repeat_minutes"
+                ],
+            )
 
             # Install scheduler task 2 - send standard bulletins (advertising the program instance)
             # The bulletin messages consist of fixed content and are defined at the beginning of
-            # this program code
+            # this program code. The task checks for due bulletins at every tick;
+            # bulletins are sent at their (regular or individual) interval
             my_scheduler.add_job(
                 send_bulletin_messages,
                 "interval",
                 id="aprsbulletin",
-                minutes=program_config["coac_bulletin_config"][
-                    "aprsis_bulletin_interval_minutes"
-                ],
+                seconds=min(
+                    APRS_BULLETIN_SCHEDULER_TICK_SECONDS,
+                    _aprsis_bulletin_interval_minutes * 60,
+                ),
                 args=[
                     class_instance,
-                    client_shared.AIS,
-                    aprs_bulletin_messages,
-                    program_config["coac_testing"]["aprsis_simulate_send"],
+                    client_shared.aprs_transmit_queue,
+                    aprs_bulletin_scheduler,
                 ],
                 max_instances=1,
                 coalesce=True,
@@ -893,7 +954,8 @@ def init_scheduler_jobs(class_instance: object):
 
 def remove_scheduler(aprs_scheduler: BackgroundScheduler):
     """
-    Shuts down and the scheduler whereas present.
+    Shuts down and the scheduler whereas present. Also stops the
+    transmit queue; pending beacons and bulletins are discarded.
 
     Parameters
     ==========
@@ -915,6 +977,55 @@ def remove_scheduler(aprs_scheduler: BackgroundScheduler):
             except:
                 logger.debug(msg="Exception during scheduler shutdown SystemExit loop")
 
+    # Stop the transmit queue whereas present
+    if client_shared.aprs_transmit_queue is not None:
+        logger.debug(msg="Stopping aprs_transmit_queue")
+        client_shared.aprs_transmit_queue.stop()
+        client_shared.aprs_transmit_queue = None
+
+
+def send_continuation_page(
+    from_callsign: str,
+    msg_no_supported: bool,
+    msgno_string: str,
+    new_ackrej_format: bool,
+) -> bool:
+    """
+    Sends the next page of the user's stored (paginated) response
+
+    Parameters
+    ==========
+    from_callsign: str
+        Sender's original callsign, now acting as destination callsign
+    msg_no_supported: bool
+        If True, each outgoing message will have its own message ID attached to the outgoing content
+        If False, no message ID is added
+    msgno_string: str
+        message number
+    new_ackrej_format: bool
+        see finalize_and_send_message
+
+    Returns
+    =======
+    success: bool
+        True if the next page has been sent, False if there is no
+        (unexpired) stored response for the user
+    """
+    continuation_page = client_shared.aprs_continuation_store.get_next_page(
+        callsign=from_callsign
+    )
+    if not continuation_page:
+        return False
+    logger.debug(msg=f"Sending next page to '{from_callsign}'")
+    finalize_and_send_message(
+        message_text_array=continuation_page,
+        from_callsign=from_callsign,
+        msg_no_supported=msg_no_supported,
+        msgno_string=msgno_string,
+        new_ackrej_format=new_ackrej_format,
+    )
+    return True
+
 
 def finalize_and_send_message(
     message_text_array: Iterable[str],
@@ -922,6 +1033,7 @@ def finalize_and_send_message(
     msg_no_supported: bool,
     msgno_string: str,
     new_ackrej_format: bool = False,
+    paginate: bool = False,
 ):
     """
     Finalizes the outgoing message with trailing message numbers, then
@@ -949,6 +1061,9 @@ def finalize_and_send_message(
         We generate our own message id. The user's message ID
         (from the original request) WILL be added to the
         outgoing message
+    paginate: bool
+        True: send only the first page of the message(s) if pagination
+        is enabled and store the remaining pages for the user
 
     Returns
     =======
@@ -960,16 +1075,30 @@ def finalize_and_send_message(
     # Finalize the outgoing message(s) and add the message
     # numbers if the user has requested this in his configuration
     # settings
-    message_text_array = finalize_pretty_aprs_messages(mylistarray=message_text_array)
+    # Formatted replies (see get_formatted_aprs_messages), streamed messages
+    # (see stream_pretty_aprs_messages) and stored pages of paginated
+    # responses are already final
+    if isinstance(message_text_array, list):
+        message_text_array = finalize_pretty_aprs_messages(
+            mylistarray=message_text_array,
+            formatting_profile=client_shared.formatting_profile,
+        )
+
+    # Send only the first page of the message(s) if the user has enabled
+    # pagination. The remaining pages are sent on request
+    if paginate and client_shared.aprs_continuation_store is not None:
+        message_text_array = client_shared.aprs_continuation_store.paginate(
+            callsign=from_callsign, messages=message_text_array
+        )
 
     # Send our message(s) to APRS-IS
-    _aprs_msg_count = send_aprs_message_list(
+    send_aprs_message_list(
         myaprsis=client_shared.AIS,
         simulate_send=program_config["coac_testing"]["aprsis_simulate_send"],
         message_text_array=message_text_array,
         destination_call_sign=from_callsign,
         send_with_msg_no=msg_no_supported,
-        aprs_message_counter=client_shared.aprs_message_counter.get_counter(),
+        aprs_message_counter=client_shared.aprs_message_counter,
         external_message_number=msgno_string,
         new_ackrej_format=new_ackrej_format,
         source_callsign=program_config["coac_client_config"]["aprsis_callsign"],
@@ -980,9 +1109,6 @@ def finalize_and_send_message(
         ],
     )
 
-    # And store the new APRS message number in our counter object
-    client_shared.aprs_message_counter.set_counter(_aprs_msg_count)
-
 
 if __name__ == "__main__":
     pass
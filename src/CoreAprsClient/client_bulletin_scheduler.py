@@ -0,0 +1,260 @@
+#
+# Core APRS Client
+# Scheduling of APRS bulletins
+# Author: Joerg Schultze-Lutter, 2025
+#
+# Static bulletins and dynamic bulletins without schedule settings are sent
+# together at every 'aprsis_bulletin_interval_minutes' cycle. Dynamic
+# bulletins can come with their own repeat interval and / or expiry time
+# (see CoreAprsClient.update_dynamic_aprs_bulletin). Their next due times
+# are kept in a heap; the bulletin job only has to look at the top of the
+# heap in order to figure out whether something needs to be sent.
+#
+# Optionally, a new or changed dynamic bulletin is sent right away. It is
+# then repeated with an exponentially increasing interval (initial repeat
+# interval, doubled after each transmission) until its regular interval
+# has been reached.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+from collections.abc import Mapping
+import heapq
+import threading
+import time
+from .client_logger import logger
+from .client_utils import APRSBulletinFrames
+
+# Interval (unit of measure = seconds) in which the bulletin job checks
+# for due bulletins. This is also the resolution of per-bulletin
+# intervals and expiry times
+APRS_BULLETIN_SCHEDULER_TICK_SECONDS = 60
+
+
+class APRSBulletinScheduler:
+    def __init__(
+        self,
+        bulletin_frames: APRSBulletinFrames,
+        interval_minutes: float,
+        send_on_change: bool = False,
+        initial_repeat_minutes: float = 0,
+    ):
+        """
+        This class implements the schedule of the APRS bulletins
+
+        Parameters
+        ==========
+        bulletin_frames: APRSBulletinFrames
+           The compiled static and dynamic bulletins
+        interval_minutes: float
+           Regular bulletin interval (aprsis_bulletin_interval_minutes). Used
+           for all bulletins which do not have their own interval
+        send_on_change: bool
+           True = send new or changed dynamic bulletins right away and repeat
+           them with an exponentially increasing interval
+        initial_repeat_minutes: float
+           First repeat interval after a change (send_on_change = True). The
+           interval is doubled after each transmission until the bulletin's
+           (regular or individual) interval has been reached
+
+        Returns
+        =======
+
+        """
+        self.bulletin_frames = bulletin_frames
+        self.interval = interval_minutes * 60
+        if send_on_change and initial_repeat_minutes <= 0:
+            raise ValueError("initial_repeat_minutes must be greater than zero")
+        self.send_on_change = send_on_change
+        self.initial_repeat_interval = initial_repeat_minutes * 60
+        self._next_cycle = time.monotonic() + self.interval
+        # heap of (next due time, bulletin id) for all bulletins with their
+        # own interval or a decaying repeat interval. Outdated heap entries
+        # are skipped (see self._due)
+        self._heap: list = []
+        # bulletin id -> (max interval, current interval, next due time)
+        self._due: dict = {}
+        # frames of the most recent schedule, used for detecting changes.
+        # The first schedule (e.g. after a reconnect) does not contain
+        # any changes
+        self._frames: Mapping | None = None
+        self._version = None
+        self._lock = threading.Lock()
+
+    def get_due_frames(
+        self,
+        version: int,
+        dynamic_bulletins: Mapping,
+        schedule: Mapping,
+        now: float | None = None,
+    ) -> tuple:
+        """
+        Returns the APRS bulletin frames which are due for transmission
+
+        Parameters
+        ==========
+        version: int
+            Version of the dynamic bulletins
+        dynamic_bulletins: Mapping
+            The user's dynamic bulletins. Key = BLNxxx or NWS-xxx,
+            Value = Bulletin Text
+        schedule: Mapping
+            Schedule settings of the dynamic bulletins. Key = BLNxxx or
+            NWS-xxx, Value = (expiry time, interval); both values are
+            optional (None) and based on time.monotonic()
+        now: float | None
+            Current time.monotonic() value; None = use the current time
+
+        Returns
+        =======
+        frames: tuple
+            The ready-to-send APRS bulletin frames which are due
+        """
+        if now is None:
+            now = time.monotonic()
+
+        frames = self.bulletin_frames.get_frames(
+            version=version, dynamic_bulletins=dynamic_bulletins
+        )
+        # the compiled bulletins use upper case identifiers. Static bulletins
+        # take precedence over dynamic bulletins and always use the regular
+        # cycle
+        static_bulletins = self.bulletin_frames.static_bulletins
+        schedule = {
+            key.upper(): value
+            for key, value in schedule.items()
+            if key.upper() not in static_bulletins
+        }
+
+        with self._lock:
+            if version != self._version:
+                self._reschedule(frames=frames, schedule=schedule, now=now)
+                self._version = version
+
+            due_ids = set()
+
+            # regular bulletin cycle: all bulletins which are not in the heap
+            if now >= self._next_cycle:
+                due_ids.update(
+                    bulletin_id
+                    for bulletin_id in frames
+                    if bulletin_id not in self._due
+                )
+                while self._next_cycle <= now:
+                    self._next_cycle += self.interval
+
+            # bulletins with their own or a decaying repeat interval
+            while self._heap and self._heap[0][0] <= now:
+                due_time, bulletin_id = heapq.heappop(self._heap)
+                if bulletin_id not in self._due:
+                    continue
+                max_interval, interval, next_due_time = self._due[bulletin_id]
+                if due_time != next_due_time:
+                    continue
+                due_ids.add(bulletin_id)
+                while next_due_time <= now:
+                    next_due_time += interval
+                self._due[bulletin_id] = (
+                    max_interval,
+                    min(interval * 2, max_interval),
+                    next_due_time,
+                )
+                heapq.heappush(self._heap, (next_due_time, bulletin_id))
+
+        # never send expired bulletins, even if the user's store has not
+        # been purged yet
+        return tuple(
+            frame
+            for bulletin_id, frame in frames.items()
+            if bulletin_id in due_ids
+            and not _is_expired(schedule=schedule, bulletin_id=bulletin_id, now=now)
+        )
+
+    def _reschedule(self, frames: Mapping, schedule: Mapping, now: float):
+        """
+        Synchronizes the heap with the current set of bulletins. Bulletins
+        with a new or changed interval are due one interval from now. If
+        send_on_change is enabled, new or changed dynamic bulletins are
+        due right away. The very first call only records the current
+        bulletins
+
+        Parameters
+        ==========
+        frames: Mapping
+            The compiled bulletins (bulletin id -> frame)
+        schedule: Mapping
+            Schedule settings of the dynamic bulletins, upper case keys,
+            without static bulletins
+        now: float
+            Current time.monotonic() value
+
+        Returns
+        =======
+        """
+        static_bulletins = self.bulletin_frames.static_bulletins
+        previous_frames = frames if self._frames is None else self._frames
+        due = {}
+        for bulletin_id, frame in frames.items():
+            interval = schedule.get(bulletin_id, (None, None))[1]
+            max_interval = interval or self.interval
+            if (
+                self.send_on_change
+                and bulletin_id not in static_bulletins
+                and frame != previous_frames.get(bulletin_id)
+            ):
+                logger.debug(msg=f"Bulletin '{bulletin_id}' has changed; sending it")
+                due[bulletin_id] = (
+                    max_interval,
+                    min(self.initial_repeat_interval, max_interval),
+                    now,
+                )
+            elif bulletin_id in self._due and self._due[bulletin_id][0] == max_interval:
+                due[bulletin_id] = self._due[bulletin_id]
+            elif interval:
+                logger.debug(
+                    msg=f"Scheduling bulletin '{bulletin_id}' every {interval} seconds"
+                )
+                due[bulletin_id] = (interval, interval, now + interval)
+        self._due = due
+        self._frames = frames
+        self._heap = [
+            (due_time, bulletin_id) for bulletin_id, (_, _, due_time) in due.items()
+        ]
+        heapq.heapify(self._heap)
+
+
+def _is_expired(schedule: Mapping, bulletin_id: str, now: float) -> bool:
+    """
+    Checks if a dynamic bulletin has expired
+
+    Parameters
+    ==========
+    schedule: Mapping
+        Schedule settings of the dynamic bulletins, upper case keys
+    bulletin_id: str
+        The bulletin's identifier
+    now: float
+        Current time.monotonic() value
+
+    Returns
+    =======
+    expired: bool
+        True if the bulletin has expired
+    """
+    expires_at = schedule.get(bulletin_id, (None, None))[0]
+    return expires_at is not None and expires_at <= now
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,277 @@
+#
+# Core APRS Client
+# Compaction of outgoing APRS message texts
+# Author: Joerg Schultze-Lutter, 2025
+#
+# Every APRS message that we do not need to send saves us a full
+# 'packet_delay_message' delay. Prior to its segmentation, an outgoing
+# response can therefore be compacted: configurable abbreviations
+# (e.g. 'temperature' -> 'temp'), whitespace collapsing and compact
+# numbers / units (e.g. '12.50 km' -> '12.5km'). All rules are compiled
+# into a single regular expression which processes the text in one pass.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+import re
+import threading
+from collections import deque
+from collections.abc import Callable
+
+# Units which get attached to a preceding number ('5 km' -> '5km'). The list
+# is limited to units which are unlikely to be regular (English) words
+APRS_COMPACTION_UNITS = (
+    "km/h",
+    "kmh",
+    "mph",
+    "kts",
+    "kt",
+    "hPa",
+    "mbar",
+    "mm",
+    "cm",
+    "km",
+    "mi",
+    "ft",
+    "m",
+    "kg",
+    "GHz",
+    "MHz",
+    "kHz",
+    "Hz",
+    "°C",
+    "°F",
+    "°",
+    "%",
+)
+
+# Maximum number of replies whose saved APRS messages have not been counted
+# yet (see APRSTextCompactor.add_statistics). Beyond that limit, the oldest
+# pending reply is counted right away
+APRS_COMPACTION_MAX_PENDING_REPLIES = 256
+
+
+class APRSTextCompactor:
+    def __init__(
+        self,
+        abbreviations: dict,
+        collapse_whitespace: bool,
+        compact_numbers: bool,
+    ):
+        """
+        This class implements the compaction of outgoing APRS message texts
+
+        Parameters
+        ==========
+        abbreviations: dict
+           Words / phrases (case-insensitive) and their abbreviations
+        collapse_whitespace: bool
+           True = replace sequences of whitespace characters with a single space
+        compact_numbers: bool
+           True = remove trailing zeros from decimal numbers and attach
+           units to their numbers
+
+        Returns
+        =======
+
+        """
+        self.abbreviations = {
+            key.strip().lower(): str(value).strip()
+            for key, value in abbreviations.items()
+            if key.strip()
+        }
+        self.collapse_whitespace = collapse_whitespace
+        self.compact_numbers = compact_numbers
+        self.pattern = self._build_pattern()
+        self._lock = threading.Lock()
+        self._statistics = {
+            "replies": 0,
+            "compacted_replies": 0,
+            "bytes_saved": 0,
+            "segments_saved": 0,
+        }
+        self._pending_segments_saved = deque()
+
+    def _build_pattern(self) -> re.Pattern | None:
+        """
+        Compiles all compaction rules into a single regular expression
+
+        Parameters
+        ==========
+
+        Returns
+        =======
+        pattern: re.Pattern | None
+            The compaction pattern or None if there is nothing to compact
+        """
+        alternatives = []
+        if self.abbreviations:
+            # longest phrases first so that e.g. 'temperature max' wins
+            # over 'temperature'
+            phrases = sorted(self.abbreviations, key=len, reverse=True)
+            alternatives.append(
+                r"(?P<abbr>(?<!\w)(?i:"
+                + "|".join(re.escape(phrase) for phrase in phrases)
+                + r")(?!\w))"
+            )
+        if self.collapse_whitespace:
+            alternatives.append(r"(?P<ws>\s{2,}|[^\S ])")
+        if self.compact_numbers:
+            alternatives.append(r"(?<![\w.])(?P<int>\d+)\.(?P<frac>\d*?)0+(?!\d|\.\d)")
+            alternatives.append(
+                r"(?<=\d) (?P<unit>"
+                + "|".join(re.escape(unit) for unit in APRS_COMPACTION_UNITS)
+                + r")(?!\w)"
+            )
+        if not alternatives:
+            return None
+        return re.compile("|".join(alternatives))
+
+    def _replace(self, match: re.Match) -> str:
+        """
+        Replacement function for the compaction pattern
+
+        Parameters
+        ==========
+        match: re.Match
+            The current match
+
+        Returns
+        =======
+        replacement: str
+            The compacted text
+        """
+        group = match.lastgroup
+        if group == "abbr":
+            return self.abbreviations.get(match.group().lower(), match.group())
+        if group == "ws":
+            return " "
+        if group == "unit":
+            return match.group("unit")
+        # decimal number with trailing zeros
+        if match.group("frac"):
+            return f"{match.group('int')}.{match.group('frac')}"
+        return match.group("int")
+
+    def compact(self, message_text: str) -> str:
+        """
+        Compacts an outgoing message text. The statistics are not updated;
+        see add_statistics
+
+        Parameters
+        ==========
+        message_text: str
+            The outgoing message text
+
+        Returns
+        =======
+        message_text: str
+            The compacted message text
+        """
+        compacted_text = message_text
+        if self.pattern:
+            compacted_text = self.pattern.sub(self._replace, message_text)
+        if self.collapse_whitespace:
+            compacted_text = compacted_text.strip()
+        return compacted_text
+
+    def add_statistics(
+        self,
+        message_text: str,
+        compacted_text: str,
+        segments_saved: int = 0,
+        count_segments_saved: Callable[[], int] | None = None,
+    ):
+        """
+        Adds a compacted reply to the statistics. This happens for every
+        reply that is sent, even if its compaction has been cached.
+        Determining the number of saved APRS messages requires a second
+        segmentation of the reply; instead of 'segments_saved', the caller
+        can therefore pass a function which is only called once the
+        statistics are requested
+
+        Parameters
+        ==========
+        message_text: str
+            The original message text
+        compacted_text: str
+            The compacted message text
+        segments_saved: int
+            Number of APRS messages that the compaction has saved
+        count_segments_saved: Callable[[], int] | None
+            Function which returns the number of APRS messages that the
+            compaction has saved
+
+        Returns
+        =======
+        """
+        bytes_saved = len(message_text.encode("utf-8")) - len(
+            compacted_text.encode("utf-8")
+        )
+        with self._lock:
+            self._statistics["replies"] += 1
+            if bytes_saved > 0:
+                self._statistics["compacted_replies"] += 1
+                self._statistics["bytes_saved"] += bytes_saved
+            self._statistics["segments_saved"] += segments_saved
+        if count_segments_saved:
+            self._pending_segments_saved.append(count_segments_saved)
+            if len(self._pending_segments_saved) > APRS_COMPACTION_MAX_PENDING_REPLIES:
+                self._count_pending_segments_saved(max_replies=1)
+
+    def _count_pending_segments_saved(self, max_replies: int | None = None):
+        """
+        Counts the saved APRS messages of the pending replies
+        (see add_statistics)
+
+        Parameters
+        ==========
+        max_replies: int | None
+            Maximum number of pending replies to count, None = all of them
+
+        Returns
+        =======
+        """
+        segments_saved = 0
+        while max_replies is None or max_replies > 0:
+            try:
+                count_segments_saved = self._pending_segments_saved.popleft()
+            except IndexError:
+                break
+            segments_saved += count_segments_saved()
+            if max_replies is not None:
+                max_replies -= 1
+        if segments_saved:
+            with self._lock:
+                self._statistics["segments_saved"] += segments_saved
+
+    def get_statistics(self) -> dict:
+        """
+        Returns the compaction statistics
+
+        Parameters
+        ==========
+
+        Returns
+        =======
+        statistics: dict
+            number of (compacted) replies, saved bytes and saved APRS messages
+        """
+        self._count_pending_segments_saved()
+        with self._lock:
+            return dict(self._statistics)
+
+
+if __name__ == "__main__":
+    pass
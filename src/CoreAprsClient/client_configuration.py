@@ -26,6 +26,7 @@
 import configparser
 from os import path
 from .client_configuration_schema import (
+    CONFIGURATION_DEFAULTS,
     CONFIGURATION_SCHEMA,
     EXCLUDED_CONFIGURATION_SCHEMA,
 )
@@ -54,6 +55,7 @@ def load_config(config_file: str):
         try:
             config.read(config_file)
             config_to_dict(config)
+            apply_config_defaults(program_config)
         except:
             program_config.clear()
     else:
@@ -108,6 +110,25 @@ def config_to_dict(myconfig: configparser.ConfigParser):
     return program_config
 
 
+def apply_config_defaults(cfg: dict):
+    """
+    Helper method: adds the default values of all optional keys
+    (see CONFIGURATION_DEFAULTS) which are missing from the config file data
+
+    Parameters
+    ==========
+    cfg: dict
+        Dictionary with data from config file
+
+    Returns
+    =======
+    """
+    for section, defaults in CONFIGURATION_DEFAULTS.items():
+        values = cfg.setdefault(section, {})
+        for key, value in defaults.items():
+            values.setdefault(key, value)
+
+
 def get_config():
     """
     Helper method: gets the program configuration dictionary
@@ -163,9 +184,14 @@ def validate_config_schema(cfg: dict):
                 continue
             actual_value = values[key]
             if not isinstance(actual_value, expected_type):
+                # the schema may permit more than one type, e.g. (int, float)
+                if isinstance(expected_type, tuple):
+                    expected_name = " or ".join(item.__name__ for item in expected_type)
+                else:
+                    expected_name = expected_type.__name__
                 raise TypeError(
                     f"Configuration file section '{section}': key '{key}' has wrong type "
-                    f"(expected {expected_type.__name__}, got {type(actual_value).__name__})"
+                    f"(expected {expected_name}, got {type(actual_value).__name__})"
                 )
 
 
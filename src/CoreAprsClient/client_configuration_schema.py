@@ -37,6 +37,7 @@ CONFIGURATION_SCHEMA = {
         "aprs_client_name": str,
         "aprs_input_parser_default_error_message": str,
         "aprs_message_enumeration": bool,
+        "aprs_message_optimal_segmentation": bool,
     },
     "coac_network_config": {
         "aprsis_server_name": str,
@@ -56,6 +57,8 @@ CONFIGURATION_SCHEMA = {
     "coac_bulletin_config": {
         "aprsis_broadcast_bulletins": bool,
         "aprsis_bulletin_interval_minutes": int,
+        "aprsis_bulletin_send_on_change": bool,
+        "aprsis_bulletin_initial_repeat_minutes": int,
     },
     "coac_crash_handler": {
         "apprise_config_file": str,
@@ -64,6 +67,20 @@ CONFIGURATION_SCHEMA = {
     "coac_dupe_detection": {
         "msg_cache_max_entries": int,
         "msg_cache_time_to_live": int,
+        "msg_cache_snapshot_interval": int,
+        "msg_cache_shared_memory": bool,
+    },
+    "coac_pagination": {
+        "pagination_enabled": bool,
+        "pagination_page_size": int,
+        "pagination_more_keyword": str,
+        "pagination_max_entries": int,
+        "pagination_time_to_live": int,
+    },
+    "coac_compaction": {
+        "compaction_enabled": bool,
+        "compaction_collapse_whitespace": bool,
+        "compaction_compact_numbers": bool,
     },
     "coac_message_delay": {
         "packet_delay_message": float,
@@ -78,15 +95,62 @@ CONFIGURATION_SCHEMA = {
     },
     "coac_data_storage": {
         "aprs_data_directory": str,
+        "aprs_state_file_name": str,
         "aprs_message_counter_file_name": str,
+        "aprs_message_counter_flush_interval": (int, float),
+        "aprs_message_counter_fsync": bool,
+        "aprs_message_number_alphabet": str,
+        "aprs_message_number_length": int,
+        "aprs_message_number_per_destination": bool,
+        "aprs_message_cache_file_name": str,
+    },
+}
+
+# This section defines the default values of optional configuration data.
+# Keys (and whole sections) which are missing from the configuration file
+# get these values prior to the validation, thus allowing configuration
+# files from previous versions to be used without any changes. The values
+# match the defaults which are documented in the configuration file template
+CONFIGURATION_DEFAULTS = {
+    "coac_client_config": {
+        "aprs_message_optimal_segmentation": False,
+    },
+    "coac_bulletin_config": {
+        "aprsis_bulletin_send_on_change": False,
+        "aprsis_bulletin_initial_repeat_minutes": 15,
+    },
+    "coac_dupe_detection": {
+        "msg_cache_snapshot_interval": 300,
+        "msg_cache_shared_memory": False,
+    },
+    "coac_pagination": {
+        "pagination_enabled": False,
+        "pagination_page_size": 3,
+        "pagination_more_keyword": "more",
+        "pagination_max_entries": 100,
+        "pagination_time_to_live": 600,
+    },
+    "coac_compaction": {
+        "compaction_enabled": False,
+        "compaction_collapse_whitespace": True,
+        "compaction_compact_numbers": True,
+    },
+    "coac_data_storage": {
+        "aprs_state_file_name": "core_aprs_client_state.bin",
+        "aprs_message_counter_flush_interval": 5.0,
+        "aprs_message_counter_fsync": False,
+        "aprs_message_number_alphabet": "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789",
+        "aprs_message_number_length": 5,
+        "aprs_message_number_per_destination": False,
+        "aprs_message_cache_file_name": "core_aprs_client_message_cache.bin",
     },
 }
 
 # This section defines the configuration data that we want to
 # _exclude_ from validation. We cannot validate the bulletin
-# messages as they represent dynamic data which can be changed
-# by the end user
-EXCLUDED_CONFIGURATION_SCHEMA = ["coac_bulletin_messages"]
+# messages and the compaction dictionary as they represent dynamic
+# data which can be changed by the end user
+EXCLUDED_CONFIGURATION_SCHEMA = ["coac_bulletin_messages", "coac_compaction_dictionary"]
 
 
 if __name__ == "__main__":
@@ -21,14 +21,1143 @@
 # with this program; if not, write to the Free Software Foundation, Inc.,
 # 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 #
-from expiringdict import ExpiringDict
 from .client_logger import logger
+from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import Callable
+from contextlib import contextmanager, suppress
+from multiprocessing import shared_memory, resource_tracker
+import threading
+import bisect
+import struct
+import time
+import math
+import os
+import tempfile
+
+# File locks are used for synchronizing access to the shared memory dupe
+# cache across processes. They are only available on POSIX systems
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Dupe cache entry states. A message is marked as 'in flight' the moment
+# it arrives and is set to 'completed' once its processing has finished
+MESSAGE_IN_FLIGHT = 0
+MESSAGE_COMPLETED = 1
+
+# Binary layout of the dupe cache snapshot file:
+# header: magic, file format version, number of records
+# record: 64 bit dupe detection key, wall clock time stamp of the cache entry
+SNAPSHOT_MAGIC = b"COAC"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct("<4sBI")
+SNAPSHOT_RECORD = struct.Struct("<Qd")
+
+# Number of time wheel buckets per TTL. Entries expire in batches, one
+# bucket at a time; the bucket width is max_age_seconds / TIME_WHEEL_BUCKETS
+# (min. 1 second). As an entry's insertion time is truncated to the start
+# of its bucket, every entry is kept for one additional (grace) bucket. An
+# entry therefore lives for at least its TTL and at most two bucket widths
+# longer.
+TIME_WHEEL_BUCKETS = 60
+
+# Default number of lock stripes (shards) of the APRS message dupe cache
+# Each shard has its own lock and time wheel store, meaning that parallel
+# workers only contend with each other if their keys map to the same shard
+MESSAGE_CACHE_SHARDS = 8
+
+# Binary layout of the cross-process shared memory dupe cache:
+# header: magic, number of hash table slots (always a power of two)
+# slot: 64 bit dupe detection key (0 = unused slot), wall clock expiry
+#       time stamp (0 = released), entry state
+# Lookups and inserts probe at most SHARED_CACHE_MAX_PROBES adjacent slots
+SHARED_CACHE_MAGIC = b"COACSHM1"
+SHARED_CACHE_HEADER = struct.Struct("<8sQ")
+SHARED_CACHE_SLOT = struct.Struct("<QdB7x")
+SHARED_CACHE_MAX_PROBES = 32
+
+# Upper bounds (in seconds) of the histogram of how long after the original
+# message its duplicates arrived. The last histogram bin collects everything
+# beyond the final bound
+DUPE_AGE_HISTOGRAM_BOUNDS = (10, 30, 60, 300, 600, 1800, 3600, 7200, 21600, 86400)
+
+
+class DupeCacheStatistics:
+    def __init__(self):
+        """
+        Counters of the APRS message dupe cache. These values help to
+        decide if msg_cache_max_entries and msg_cache_time_to_live are
+        sized correctly: duplicates which arrive close to the TTL suggest a
+        longer TTL, whereas a high number of evictions suggests that the
+        cache is too small.
+
+        Parameters
+        ==========
+
+        Returns
+        =======
+        """
+        self.lookups = 0
+        self.duplicates = 0
+        self.inserts = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.duplicate_age_histogram = [0] * (len(DUPE_AGE_HISTOGRAM_BOUNDS) + 1)
+
+    def add_duplicate(self, age_seconds: float):
+        """
+        Registers a suppressed duplicate
+
+        Parameters
+        ==========
+        age_seconds: float
+           Time span between the original message and its duplicate
+
+        Returns
+        =======
+        """
+        self.duplicates += 1
+        self.duplicate_age_histogram[
+            bisect.bisect_left(DUPE_AGE_HISTOGRAM_BOUNDS, age_seconds)
+        ] += 1
+
+    def add(self, other: "DupeCacheStatistics"):
+        """
+        Adds the counters of another statistics object to this one
+
+        Parameters
+        ==========
+        other: DupeCacheStatistics
+           The statistics object whose values are to be added
+
+        Returns
+        =======
+        """
+        self.lookups += other.lookups
+        self.duplicates += other.duplicates
+        self.inserts += other.inserts
+        self.expirations += other.expirations
+        self.evictions += other.evictions
+        for index, count in enumerate(other.duplicate_age_histogram):
+            self.duplicate_age_histogram[index] += count
+
+    def as_dict(self) -> dict:
+        """
+        Returns the statistics as dictionary
+
+        Parameters
+        ==========
+
+        Returns
+        =======
+        statistics: dict
+           Counters plus duplicate hit rate and the duplicate age histogram.
+           The histogram's keys denote the upper bound of each bin
+        """
+        labels = [f"<={bound}s" for bound in DUPE_AGE_HISTOGRAM_BOUNDS]
+        labels.append(f">{DUPE_AGE_HISTOGRAM_BOUNDS[-1]}s")
+        return {
+            "lookups": self.lookups,
+            "duplicates": self.duplicates,
+            "duplicate_rate": (
+                self.duplicates / self.lookups if self.lookups > 0 else 0.0
+            ),
+            "inserts": self.inserts,
+            "expirations": self.expirations,
+            "evictions": self.evictions,
+            "duplicate_age_histogram": dict(zip(labels, self.duplicate_age_histogram)),
+        }
+
+
+class DupeCacheCapacity:
+    def __init__(self, max_len: int):
+        """
+        Entry counter which enforces the max_len limit across all
+        shards of a dupe cache
+
+        Parameters
+        ==========
+        max_len: int
+           Number of max cache entries
+
+        Returns
+        =======
+        """
+        self.max_len = max_len
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def add(self, delta: int):
+        with self._lock:
+            self._count += delta
+
+    def try_reserve(self) -> bool:
+        """
+        Atomically checks for free capacity and reserves it for a new entry
+
+        Parameters
+        ==========
+
+        Returns
+        =======
+        reserved: bool
+           True if the capacity has been reserved, False if the cache is full
+        """
+        with self._lock:
+            if self._count >= self.max_len:
+                return False
+            self._count += 1
+            return True
+
+
+class TimeWheelDupeStore:
+    def __init__(
+        self,
+        max_len: int,
+        max_age_seconds: int,
+        capacity: DupeCacheCapacity | None = None,
+    ):
+        """
+        Purpose-built expiring key store for the APRS dupe detection.
+
+        Every key is mapped to the index of the time wheel bucket in which
+        it was inserted (based on the monotonic clock). Each bucket holds the
+        keys that were inserted during its time span in insertion order.
+        Expired entries are removed bucket by bucket, and the max_len limit
+        is enforced by evicting from the oldest bucket - both operations
+        are O(1) per entry, regardless of the number of entries in the store.
+
+        Note that this class is not thread-safe; see APRSMessageCache
+
+        Parameters
+        ==========
+        max_len: int
+           Number of max store entries
+        max_age_seconds: int
+           life span per entry in seconds
+        capacity: DupeCacheCapacity | None
+           Capacity which is shared with other stores (e.g. the shards of
+           APRSMessageCache). If set, max_len is enforced across all of
+           these stores
+
+        Returns
+        =======
+        """
+        self._capacity = capacity or DupeCacheCapacity(max_len=max_len)
+        self._bucket_seconds = max(1.0, max_age_seconds / TIME_WHEEL_BUCKETS)
+        # number of buckets an entry is kept, including the grace bucket
+        self._ttl_buckets = math.ceil(max_age_seconds / self._bucket_seconds) + 1
+
+        # key -> bucket index of the entry
+        self._entries: dict[int, int] = {}
+        # bucket index -> keys inserted into that bucket, in insertion order
+        # buckets are created in ascending order, so the first bucket in this
+        # dictionary is always the oldest one
+        self._wheel: dict[int, deque] = {}
+        # keys which have been claimed but not yet been completed
+        self._in_flight: set[int] = set()
+
+        # number of entries removed due to TTL expiry / due to max_len
+        self.expirations = 0
+        self.evictions = 0
+
+    def _current_bucket(self) -> int:
+        return int(time.monotonic() // self._bucket_seconds)
+
+    def _drop(self, key: int, bucket: int) -> bool:
+        # The key might have been re-inserted into a newer bucket in the
+        # meantime; in that case, the old bucket's reference is stale
+        if self._entries.get(key) == bucket:
+            del self._entries[key]
+            self._in_flight.discard(key)
+            self._capacity.add(-1)
+            return True
+        return False
+
+    def expire(self):
+        """
+        Removes all buckets (and their entries) whose life span has expired
+
+        Parameters
+        ==========
+
+        Returns
+        =======
+        """
+        cutoff = self._current_bucket() - self._ttl_buckets
+        while self._wheel:
+            bucket = next(iter(self._wheel))
+            if bucket > cutoff:
+                break
+            for key in self._wheel.pop(bucket):
+                if self._drop(key=key, bucket=bucket):
+                    self.expirations += 1
+
+    def _reserve(self, make_room: Callable[[], bool] | None):
+        # Reserve the capacity for a new entry. If the (shared) capacity is
+        # exhausted, evict the oldest entry - from this store or, if it is
+        # empty, through 'make_room' from another store
+        while not self._capacity.try_reserve():
+            if self.evict_oldest():
+                continue
+            if make_room is None or not make_room():
+                # nothing left that could be evicted
+                self._capacity.add(1)
+                return
+
+    def evict_oldest(self) -> bool:
+        """
+        Evicts the store's oldest entry
+
+        Parameters
+        ==========
+
+        Returns
+        =======
+        evicted: bool
+           True if an entry has been evicted, False if the store is empty
+        """
+        while self._wheel:
+            bucket = next(iter(self._wheel))
+            keys = self._wheel[bucket]
+            while keys:
+                if self._drop(key=keys.popleft(), bucket=bucket):
+                    self.evictions += 1
+                    if not keys:
+                        del self._wheel[bucket]
+                    return True
+            del self._wheel[bucket]
+        return False
+
+    def set(
+        self,
+        key: int,
+        state: int,
+        set_time: float | None = None,
+        make_room: Callable[[], bool] | None = None,
+    ):
+        """
+        Adds or updates a store entry. The entry's life span starts at
+        'set_time' (default: now)
+
+        Parameters
+        ==========
+        key: int
+           Dupe detection key
+        state: int
+           MESSAGE_IN_FLIGHT or MESSAGE_COMPLETED
+        set_time: float | None
+           Wall clock time stamp of the entry (used when restoring entries
+           from a snapshot). 'None' = now
+        make_room: Callable[[], bool] | None
+           Called if the shared capacity is exhausted and this store is
+           empty; evicts an entry from another store. Returns False if
+           there was nothing to evict
+
+        Returns
+        =======
+        """
+        self.expire()
+        bucket = self._current_bucket()
+        if set_time is not None:
+            bucket -= int((time.time() - set_time) // self._bucket_seconds)
+            if bucket <= self._current_bucket() - self._ttl_buckets:
+                return
+        if key not in self._entries:
+            self._reserve(make_room=make_room)
+        self._entries[key] = bucket
+        if bucket not in self._wheel:
+            self._wheel[bucket] = deque()
+            # restored entries may be older than the current buckets
+            # keep the wheel in ascending bucket order
+            if bucket < next(iter(self._wheel)):
+                self._wheel = dict(sorted(self._wheel.items()))
+        self._wheel[bucket].append(key)
+        if state == MESSAGE_IN_FLIGHT:
+            self._in_flight.add(key)
+        else:
+            self._in_flight.discard(key)
+
+    def pop(self, key: int):
+        """
+        Removes an entry from the store (if present). Its bucket
+        reference becomes stale and is skipped on expiry
+
+        Parameters
+        ==========
+        key: int
+           Dupe detection key
+
+        Returns
+        =======
+        """
+        if self._entries.pop(key, None) is not None:
+            self._capacity.add(-1)
+        self._in_flight.discard(key)
+
+    def items_with_timestamp(self) -> list:
+        """
+        Returns all completed (read: not in flight) entries along
+        with their wall clock time stamps
+
+        Parameters
+        ==========
+
+        Returns
+        =======
+        items: list
+           list of (key, wall clock time stamp) tuples
+        """
+        self.expire()
+        offset = time.time() - time.monotonic()
+        return [
+            (key, bucket * self._bucket_seconds + offset)
+            for key, bucket in self._entries.items()
+            if key not in self._in_flight
+        ]
+
+    def age(self, key: int) -> float | None:
+        """
+        Returns the age of an entry (with the precision of the
+        time wheel's bucket width)
+
+        Parameters
+        ==========
+        key: int
+           Dupe detection key
+
+        Returns
+        =======
+        age: float | None
+           Age of the entry in seconds or 'None' if not present / expired
+        """
+        bucket = self._entries.get(key)
+        if bucket is None:
+            return None
+        buckets = self._current_bucket() - bucket
+        if buckets >= self._ttl_buckets:
+            return None
+        return buckets * self._bucket_seconds
+
+    def __contains__(self, key: int) -> bool:
+        # Check the entry's own bucket rather than running the batch
+        # expiry; the latter is taken care of by the next insert
+        bucket = self._entries.get(key)
+        return (
+            bucket is not None and bucket > self._current_bucket() - self._ttl_buckets
+        )
+
+    def __len__(self) -> int:
+        self.expire()
+        return len(self._entries)
+
+
+class DupeCacheSnapshots(ABC):
+    """
+    Base class for the APRS message dupe caches. Takes care of writing
+    the cache's snapshot file and of restoring the cache from that file.
+    Derived classes provide the cache entries via _completed_entries and
+    restore them via _restore_entry
+    """
+
+    _max_age_seconds: int
+    _snapshot_thread: threading.Thread | None = None
+    _snapshot_stop: threading.Event
+
+    @abstractmethod
+    def _completed_entries(self) -> list:
+        pass
+
+    @abstractmethod
+    def _restore_entry(self, key: int, set_time: float) -> bool:
+        pass
+
+    @abstractmethod
+    def _statistics(self) -> DupeCacheStatistics:
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    def close(self):
+        """
+        Releases the cache's resources. Nothing to do by default
+
+        Parameters
+        ==========
+
+        Returns
+        =======
+        """
+        pass
+
+    def get_statistics(self) -> dict:
+        """
+        Returns the dupe cache's statistics: number of lookups, suppressed
+        duplicates, inserts, TTL expirations and capacity evictions plus
+        the histogram of how long after the original message its
+        duplicates arrived
+
+        Parameters
+        ==========
+
+        Returns
+        =======
+        statistics: dict
+           The dupe cache statistics, incl. the cache's current size and
+           its configured TTL
+        """
+        statistics = self._statistics().as_dict()
+        statistics["size"] = len(self)
+        statistics["time_to_live"] = self._max_age_seconds
+        return statistics
+
+    def write_snapshot(self, file_name: str):
+        """
+        Writes all completed cache entries to a binary snapshot file.
+        Entries which are still in flight are not persisted. The cache
+        is only locked while its entries are copied; the file itself is
+        written outside of the lock to a unique temporary file (several
+        processes may share the same snapshot file) and then atomically
+        renamed
+
+        Parameters
+        ==========
+        file_name: str
+           Full path name of the snapshot file
+
+        Returns
+        =======
+        """
+        entries = self._completed_entries()
+
+        data = bytearray(
+            SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(entries))
+        )
+        for key, set_time in entries:
+            data += SNAPSHOT_RECORD.pack(key, set_time)
+
+        temp_file_name = None
+        try:
+            fd, temp_file_name = tempfile.mkstemp(
+                dir=os.path.dirname(os.path.abspath(file_name)),
+                prefix=f"{os.path.basename(file_name)}.",
+                suffix=".tmp",
+            )
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_file_name, file_name)
+            logger.debug(msg=f"Wrote {len(entries)} dupe cache entries to {file_name}")
+        except (IOError, OSError):
+            logger.debug(msg=f"Cannot write dupe cache snapshot to {file_name}")
+            if temp_file_name:
+                with suppress(OSError):
+                    os.remove(temp_file_name)
+
+    def read_snapshot(self, file_name: str):
+        """
+        Reads a dupe cache snapshot file and restores all entries
+        which have not yet expired. Restored entries keep their original
+        time stamp, meaning that they only live for their remaining TTL
+
+        Parameters
+        ==========
+        file_name: str
+           Full path name of the snapshot file
+
+        Returns
+        =======
+        """
+        try:
+            with open(file_name, "rb") as f:
+                data = f.read()
+            magic, version, count = SNAPSHOT_HEADER.unpack_from(data, 0)
+            if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+                raise ValueError("Unsupported snapshot file format")
+            entries = list(
+                SNAPSHOT_RECORD.iter_unpack(
+                    data[
+                        SNAPSHOT_HEADER.size : SNAPSHOT_HEADER.size
+                        + count * SNAPSHOT_RECORD.size
+                    ]
+                )
+            )
+        except FileNotFoundError:
+            logger.debug(msg=f"No dupe cache snapshot found at {file_name}")
+            return
+        except (IOError, OSError, ValueError, struct.error):
+            logger.debug(msg=f"Cannot read dupe cache snapshot from {file_name}")
+            return
+
+        # Restore the entries in their original order, skipping
+        # everything that has already expired in the meantime
+        cutoff = time.time() - self._max_age_seconds
+        restored = 0
+        for key, set_time in sorted(entries, key=lambda entry: entry[1]):
+            if set_time > cutoff and self._restore_entry(key=key, set_time=set_time):
+                restored += 1
+        logger.debug(msg=f"Restored {restored} dupe cache entries from {file_name}")
+
+    def start_snapshots(self, file_name: str, interval_seconds: int):
+        """
+        Starts a background thread which periodically writes the
+        dupe cache snapshot to disk
+
+        Parameters
+        ==========
+        file_name: str
+           Full path name of the snapshot file
+        interval_seconds: int
+           Snapshot interval in seconds. A value of zero disables the
+           periodic snapshots; the snapshot is then only written on shutdown
+
+        Returns
+        =======
+        """
+        if interval_seconds <= 0 or self._snapshot_thread:
+            return
+
+        def _snapshot_loop():
+            while not self._snapshot_stop.wait(timeout=interval_seconds):
+                self.write_snapshot(file_name=file_name)
+
+        self._snapshot_stop.clear()
+        self._snapshot_thread = threading.Thread(
+            target=_snapshot_loop, name="aprs_message_cache_snapshot", daemon=True
+        )
+        self._snapshot_thread.start()
+
+    def stop_snapshots(self, file_name: str):
+        """
+        Stops the periodic snapshot thread (if running) and writes
+        a final snapshot to disk
+
+        Parameters
+        ==========
+        file_name: str
+           Full path name of the snapshot file
+
+        Returns
+        =======
+        """
+        if self._snapshot_thread:
+            self._snapshot_stop.set()
+            self._snapshot_thread.join()
+            self._snapshot_thread = None
+        self.write_snapshot(file_name=file_name)
+
+
+class APRSMessageCache(DupeCacheSnapshots):
+    def __init__(
+        self, max_len: int, max_age_seconds: int, shards: int = MESSAGE_CACHE_SHARDS
+    ):
+        """
+        Thread-safe APRS message dupe cache. Provides an atomic
+        check-and-insert operation on top of the TimeWheelDupeStore.
+
+        The cache is split up into 1..n lock-striped shards; a key's
+        shard is determined by its (uniformly distributed) hash value.
+        'max_len' applies to the cache as a whole: if the cache is full,
+        the shard which receives the new entry evicts its oldest entry.
+
+        Parameters
+        ==========
+        max_len: int
+           Number of max dictionary entries
+        max_age_seconds: int
+           life span per entry in seconds
+        shards: int
+           Number of shards (lock stripes)
+
+        Returns
+        =======
+        """
+        self._max_age_seconds = max_age_seconds
+
+        # never create more shards than we have cache entries
+        shards = max(1, min(shards, max_len))
+        self._capacity = DupeCacheCapacity(max_len=max_len)
+        self._shards = [
+            (
+                threading.Lock(),
+                TimeWheelDupeStore(
+                    max_len=max_len,
+                    max_age_seconds=max_age_seconds,
+                    capacity=self._capacity,
+                ),
+                DupeCacheStatistics(),
+            )
+            for _ in range(shards)
+        ]
+
+        # Snapshot thread and its stop signal (see start_snapshots)
+        self._snapshot_thread: threading.Thread | None = None
+        self._snapshot_stop = threading.Event()
+
+    def _shard(self, key: int) -> tuple:
+        return self._shards[key % len(self._shards)]
+
+    def _make_room(self, store: TimeWheelDupeStore) -> bool:
+        # Called by an empty 'store' (with its lock held) if the cache is
+        # full; a non-empty store evicts its own oldest entry (see
+        # TimeWheelDupeStore.set). As we already hold a lock, the other
+        # shards' locks are only tried (never waited for) in order to
+        # avoid deadlocks. Returns False if there was nothing to evict
+        busy = False
+        for lock, other_store, _ in self._shards:
+            if other_store is store:
+                continue
+            if not lock.acquire(blocking=False):
+                busy = True
+                continue
+            try:
+                evicted = other_store.evict_oldest()
+            finally:
+                lock.release()
+            if evicted:
+                return True
+        if busy:
+            # let the other shard's thread finish, then try again
+            time.sleep(0)
+        return busy
+
+    def seen_or_claim(self, key: int) -> bool:
+        """
+        Atomically checks if a message key is present in the cache. If
+        the key is not present, it gets claimed (marked as 'in flight')
+        so that any retransmission of the same message which arrives
+        while we are still processing the original message is detected
+        as a duplicate
+
+        Parameters
+        ==========
+        key: int
+           Dupe detection key, see get_aprs_message_cache_key
+
+        Returns
+        =======
+        seen: bool
+           True if the message is either in flight or has already been
+           processed. False if the message is new and has now been claimed
+           by the caller
+        """
+        lock, store, statistics = self._shard(key)
+        with lock:
+            statistics.lookups += 1
+            age = store.age(key)
+            if age is not None:
+                statistics.add_duplicate(age_seconds=age)
+                return True
+            store.set(
+                key=key,
+                state=MESSAGE_IN_FLIGHT,
+                make_room=lambda: self._make_room(store=store),
+            )
+            statistics.inserts += 1
+            return False
+
+    def confirm(self, key: int):
+        """
+        Marks a previously claimed message as completed. The entry's
+        life span starts over at this point in time
+
+        Parameters
+        ==========
+        key: int
+           Dupe detection key, see get_aprs_message_cache_key
+
+        Returns
+        =======
+        """
+        lock, store, _ = self._shard(key)
+        with lock:
+            # the claim might have been evicted in the meantime; in that
+            # case, the entry needs new capacity
+            store.set(
+                key=key,
+                state=MESSAGE_COMPLETED,
+                make_room=lambda: self._make_room(store=store),
+            )
+
+    def release(self, key: int):
+        """
+        Removes a claim from the cache, e.g. if the message could not
+        be processed and a retransmission should be accepted again
+
+        Parameters
+        ==========
+        key: int
+           Dupe detection key, see get_aprs_message_cache_key
+
+        Returns
+        =======
+        """
+        lock, store, _ = self._shard(key)
+        with lock:
+            store.pop(key)
+
+    def _completed_entries(self) -> list:
+        # The shards are locked one at a time while their entries are copied
+        entries = []
+        for lock, store, _ in self._shards:
+            with lock:
+                entries.extend(store.items_with_timestamp())
+        return entries
+
+    def _restore_entry(self, key: int, set_time: float) -> bool:
+        lock, store, _ = self._shard(key)
+        with lock:
+            if key in store:
+                return False
+            store.set(
+                key=key,
+                state=MESSAGE_COMPLETED,
+                set_time=set_time,
+                make_room=lambda: self._make_room(store=store),
+            )
+            return True
+
+    def _statistics(self) -> DupeCacheStatistics:
+        statistics = DupeCacheStatistics()
+        for lock, store, shard_statistics in self._shards:
+            with lock:
+                statistics.add(shard_statistics)
+                statistics.expirations += store.expirations
+                statistics.evictions += store.evictions
+        return statistics
+
+    def __contains__(self, key: int) -> bool:
+        lock, store, _ = self._shard(key)
+        with lock:
+            return key in store
+
+    def __len__(self) -> int:
+        length = 0
+        for lock, store, _ in self._shards:
+            with lock:
+                length += len(store)
+        return length
+
+
+def _open_shared_memory(
+    name: str, create: bool, size: int = 0
+) -> shared_memory.SharedMemory:
+    """
+    Internal helper which creates or attaches to a named shared memory
+    block. The block is not tracked by Python's resource tracker, meaning
+    that it survives the termination of the process that has created it
+    (e.g. in case of a restart or a hot-standby process)
+
+    Parameters
+    ==========
+    name: str
+       Name of the shared memory block
+    create: bool
+       True: create a new block, False: attach to an existing block
+    size: int
+       Size of the new block in bytes
+
+    Returns
+    =======
+    shm: shared_memory.SharedMemory
+       Our shared memory block
+    """
+    try:
+        return shared_memory.SharedMemory(
+            name=name, create=create, size=size, track=False
+        )
+    except TypeError:
+        # Python < 3.13 has no 'track' parameter; unregister the block
+        # from the resource tracker instead
+        shm = shared_memory.SharedMemory(name=name, create=create, size=size)
+        if os.name == "posix":
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+class SharedMemoryDupeCache(DupeCacheSnapshots):
+    def __init__(
+        self, name: str, max_len: int, max_age_seconds: int, lock_file_name: str
+    ):
+        """
+        APRS message dupe cache which is shared by all processes on the
+        host. The cache is an open addressing hash table (linear probing) of
+        fixed-size slots in a named shared memory block. Every process that
+        uses the same name attaches to the same table, meaning that dupes
+        are suppressed across all processes.
+
+        Access is serialized by a thread lock plus an exclusive file lock,
+        thus making seen_or_claim atomic across threads and processes.
+
+        Parameters
+        ==========
+        name: str
+           Name of the shared memory block
+        max_len: int
+           Number of max cache entries. The hash table gets twice as many
+           slots (rounded up to a power of two). If the block already exists,
+           its original size is used.
+        max_age_seconds: int
+           life span per entry in seconds
+        lock_file_name: str
+           Full path name of the file lock which synchronizes the processes
+
+        Returns
+        =======
+        """
+        self._max_age_seconds = max_age_seconds
+        self._snapshot_thread = None
+        self._snapshot_stop = threading.Event()
+
+        # Note that the statistics are collected per process
+        self._statistics_data = DupeCacheStatistics()
+
+        self._thread_lock = threading.Lock()
+        self._lock_file = open(lock_file_name, "a+b")
+        if not fcntl:
+            logger.warning(
+                msg="File locks are not supported on this platform; the shared dupe cache is only synchronized within this process"
+            )
+
+        with self._locked():
+            slots = 1 << max(4, (2 * max_len - 1).bit_length())
+            try:
+                self._shm = _open_shared_memory(
+                    name=name,
+                    create=True,
+                    size=SHARED_CACHE_HEADER.size + slots * SHARED_CACHE_SLOT.size,
+                )
+                SHARED_CACHE_HEADER.pack_into(
+                    self._shm.buf, 0, SHARED_CACHE_MAGIC, slots
+                )
+                logger.debug(msg=f"Created shared dupe cache '{name}'")
+            except FileExistsError:
+                self._shm = _open_shared_memory(name=name, create=False)
+                magic, slots = SHARED_CACHE_HEADER.unpack_from(self._shm.buf, 0)
+                if magic != SHARED_CACHE_MAGIC:
+                    self._shm.close()
+                    raise ValueError(
+                        f"Shared memory block '{name}' is not a dupe cache"
+                    )
+                logger.debug(msg=f"Attached to shared dupe cache '{name}'")
+        self._slots = slots
+
+    @contextmanager
+    def _locked(self):
+        with self._thread_lock:
+            if fcntl:
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _offset(self, index: int) -> int:
+        return SHARED_CACHE_HEADER.size + index * SHARED_CACHE_SLOT.size
+
+    def _probe(self, key: int, now: float) -> tuple:
+        """
+        Probes the hash table for a key. Needs to be called with the lock held
+
+        Parameters
+        ==========
+        key: int
+           Dupe detection key (never 0)
+        now: float
+           Current wall clock time stamp
+
+        Returns
+        =======
+        found: int | None
+           Slot index of the key if it is present and has not yet expired
+        target: int
+           Slot index where the key can be inserted: the first unused or
+           expired slot; if there is none, the slot which expires first
+        """
+        mask = self._slots - 1
+        index = key & mask
+        target = oldest = None
+        oldest_expiry = math.inf
+        for _ in range(min(SHARED_CACHE_MAX_PROBES, self._slots)):
+            slot_key, expiry, _state = SHARED_CACHE_SLOT.unpack_from(
+                self._shm.buf, self._offset(index)
+            )
+            if slot_key == 0:
+                # never used: this is the end of the probe sequence
+                return None, target if target is not None else index
+            if expiry <= now:
+                if target is None:
+                    target = index
+            elif slot_key == key:
+                return index, index
+            elif expiry < oldest_expiry:
+                oldest, oldest_expiry = index, expiry
+            index = (index + 1) & mask
+        return None, target if target is not None else oldest
+
+    def _write(self, index: int, key: int, expiry: float, state: int, now: float):
+        # Check if we are about to replace another message's entry
+        slot_key, slot_expiry, _state = SHARED_CACHE_SLOT.unpack_from(
+            self._shm.buf, self._offset(index)
+        )
+        if slot_key not in (0, key):
+            if slot_expiry > now:
+                self._statistics_data.evictions += 1
+            elif slot_expiry > 0:
+                self._statistics_data.expirations += 1
+        SHARED_CACHE_SLOT.pack_into(
+            self._shm.buf, self._offset(index), key, expiry, state
+        )
+
+    def seen_or_claim(self, key: int) -> bool:
+        """
+        Atomically checks if a message key is present in the cache. If
+        the key is not present, it gets claimed (marked as 'in flight')
+
+        Parameters
+        ==========
+        key: int
+           Dupe detection key, see get_aprs_message_cache_key
+
+        Returns
+        =======
+        seen: bool
+           True if the message is either in flight or has already been
+           processed (by any process). False if the message is new and has
+           now been claimed by the caller
+        """
+        key = key or 1
+        now = time.time()
+        with self._locked():
+            self._statistics_data.lookups += 1
+            found, target = self._probe(key=key, now=now)
+            if found is not None:
+                _, expiry, _ = SHARED_CACHE_SLOT.unpack_from(
+                    self._shm.buf, self._offset(found)
+                )
+                self._statistics_data.add_duplicate(
+                    age_seconds=now - (expiry - self._max_age_seconds)
+                )
+                return True
+            self._write(
+                target, key, now + self._max_age_seconds, MESSAGE_IN_FLIGHT, now
+            )
+            self._statistics_data.inserts += 1
+            return False
+
+    def confirm(self, key: int):
+        """
+        Marks a previously claimed message as completed. The entry's
+        life span starts over at this point in time
+
+        Parameters
+        ==========
+        key: int
+           Dupe detection key, see get_aprs_message_cache_key
+
+        Returns
+        =======
+        """
+        key = key or 1
+        now = time.time()
+        with self._locked():
+            _, target = self._probe(key=key, now=now)
+            self._write(
+                target, key, now + self._max_age_seconds, MESSAGE_COMPLETED, now
+            )
+
+    def release(self, key: int):
+        """
+        Removes a claim from the cache. The slot keeps its key so that
+        the probe sequences of other keys stay intact
+
+        Parameters
+        ==========
+        key: int
+           Dupe detection key, see get_aprs_message_cache_key
+
+        Returns
+        =======
+        """
+        key = key or 1
+        with self._locked():
+            found, _ = self._probe(key=key, now=time.time())
+            if found is not None:
+                self._write(found, key, 0.0, MESSAGE_COMPLETED, time.time())
+
+    def _completed_entries(self) -> list:
+        # Copy the table while holding the lock, then parse it without
+        with self._locked():
+            table = bytes(self._shm.buf[SHARED_CACHE_HEADER.size :])
+        now = time.time()
+        return [
+            (key, expiry - self._max_age_seconds)
+            for key, expiry, state in SHARED_CACHE_SLOT.iter_unpack(table)
+            if key != 0 and expiry > now and state == MESSAGE_COMPLETED
+        ]
+
+    def _restore_entry(self, key: int, set_time: float) -> bool:
+        key = key or 1
+        now = time.time()
+        with self._locked():
+            found, target = self._probe(key=key, now=now)
+            if found is not None:
+                return False
+            self._write(
+                target, key, set_time + self._max_age_seconds, MESSAGE_COMPLETED, now
+            )
+            return True
+
+    def _statistics(self) -> DupeCacheStatistics:
+        statistics = DupeCacheStatistics()
+        with self._thread_lock:
+            statistics.add(self._statistics_data)
+        return statistics
+
+    def close(self):
+        """
+        Detaches from the shared memory block. The block itself is kept
+        so that other (or future) processes can still use it
+
+        Parameters
+        ==========
+
+        Returns
+        =======
+        """
+        self._shm.close()
+        self._lock_file.close()
+
+    def __contains__(self, key: int) -> bool:
+        with self._locked():
+            found, _ = self._probe(key=key or 1, now=time.time())
+            return found is not None
+
+    def __len__(self) -> int:
+        with self._locked():
+            table = bytes(self._shm.buf[SHARED_CACHE_HEADER.size :])
+        now = time.time()
+        return sum(
+            1
+            for key, expiry, _state in SHARED_CACHE_SLOT.iter_unpack(table)
+            if key != 0 and expiry > now
+        )
 
 
 # Helper method for creating our APRS message cache
-def create_expiring_dict(max_len: int, max_age_seconds: int):
+def create_expiring_dict(
+    max_len: int,
+    max_age_seconds: int,
+    shards: int = MESSAGE_CACHE_SHARDS,
+    shared_memory_name: str | None = None,
+    lock_file_name: str | None = None,
+):
     """
-    Helper method for creating the ExpiringDict
+    Helper method for creating the APRS message dupe cache
 
     Parameters
     ==========
@@ -36,9 +1165,18 @@ def create_expiring_dict(max_len: int, max_age_seconds: int):
        Number of max dictionary entries
     max_age_seconds: int
        life span per entry in seconds
+    shards: int
+       Number of lock-striped cache shards
+    shared_memory_name: str | None
+       If set, the cache is created in (or attached to) the shared memory
+       block of this name and shared with all other processes on the host
+    lock_file_name: str | None
+       Full path name of the file lock for the shared memory cache
 
     Returns
     =======
+    aprs_message_cache: APRSMessageCache | SharedMemoryDupeCache
+       Our APRS message dupe cache
     """
 
     # Create the decaying APRS message cache. Any APRS message that is present in
@@ -46,10 +1184,19 @@ def create_expiring_dict(max_len: int, max_age_seconds: int):
     logger.debug(
         msg=f"APRS message dupe cache set to {str(max_len)} max possible entries and a TTL of {str(max_age_seconds / 60)} mins"
     )
-    aprs_message_cache = ExpiringDict(
-        max_len=max_len,
-        max_age_seconds=max_age_seconds,
-    )
+    if shared_memory_name:
+        aprs_message_cache = SharedMemoryDupeCache(
+            name=shared_memory_name,
+            max_len=max_len,
+            max_age_seconds=max_age_seconds,
+            lock_file_name=lock_file_name,
+        )
+    else:
+        aprs_message_cache = APRSMessageCache(
+            max_len=max_len,
+            max_age_seconds=max_age_seconds,
+            shards=shards,
+        )
     return aprs_message_cache
 
 
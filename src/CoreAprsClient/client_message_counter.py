@@ -21,40 +21,145 @@
 # with this program; if not, write to the Free Software Foundation, Inc.,
 # 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 #
+from collections import OrderedDict
+import re
+import threading
+import time
 from .client_logger import logger
-from .client_utils import build_full_pathname
+from .client_state_file import APRSStateFile, STATE_FILE_SLOTS
+
+# Default message number alphabet and length: AAAAA..99999 (36 ** 5 values).
+# Keep in sync with the defaults in client_configuration_schema.py
+APRS_MESSAGE_NUMBER_ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+APRS_MESSAGE_NUMBER_LENGTH = 5
+
+# APRS message numbers consist of 1..5 alphanumeric characters (aprs101.pdf)
+APRS_MESSAGE_NUMBER_MAX_LENGTH = 5
+
+# The reply-ack format (replyacks.txt) only permits 2 character message numbers
+APRS_REPLYACK_MESSAGE_NUMBER_LENGTH = 2
+
+# Max number of destination call signs with their own message number space
+# (= number of destination slots of the state file)
+APRS_MESSAGE_COUNTER_MAX_DESTINATIONS = STATE_FILE_SLOTS
+
+
+def get_alphanumeric_counter_value(
+    numeric_counter: int,
+    alphabet: str = APRS_MESSAGE_NUMBER_ALPHABET,
+    length: int = APRS_MESSAGE_NUMBER_LENGTH,
+) -> str:
+    """
+    Converts a numeric counter to its fixed-length alphanumeric
+    APRS message number
+
+    Parameters
+    ==========
+    numeric_counter: int
+        numeric counter; values beyond the message number space
+        (len(alphabet) ** length) wrap around
+    alphabet: str
+        the message number's characters
+    length: int
+        the message number's length
+
+    Returns
+    =======
+    alphanumeric_counter: str
+        alphanumeric counter that is based on the numeric counter,
+        e.g. range from AAAAA to 99999 for the default alphabet and length
+    """
+    base = len(alphabet)
+    chars = []
+    for _ in range(length):
+        numeric_counter, remainder = divmod(numeric_counter, base)
+        chars.append(alphabet[remainder])
+    return "".join(reversed(chars))
 
 
 class APRSMessageCounter:
-    def __init__(self, file_name: str):
+    def __init__(
+        self,
+        state_file: APRSStateFile,
+        fsync: bool = False,
+        alphabet: str = APRS_MESSAGE_NUMBER_ALPHABET,
+        length: int = APRS_MESSAGE_NUMBER_LENGTH,
+        per_destination: bool = False,
+        legacy_file_name: str | None = None,
+    ):
         """
-        This class implements the APRS message counter.
+        This class implements the APRS message counter. The counter
+        lives in the memory-mapped state file, meaning that every change
+        is an in-place store which survives a crash of the process.
 
         Parameters
         ==========
-        file_name: str
-           External file where the APRS message counter is stored.
+        state_file: APRSStateFile
+           State file where the APRS message counter is stored.
+        fsync: bool
+           True = msync the state file in the background whenever
+           the counter has changed (see start_flusher)
+        alphabet: str
+           The message numbers' characters (alphanumeric, no duplicates)
+        length: int
+           The message numbers' length (1..5 characters)
+        per_destination: bool
+           True = every destination call sign gets its own message number
+           space, meaning that its message numbers wrap much later
+        legacy_file_name: str | None
+           Full path name of the text file which was used for storing the
+           counter in previous versions. Its content is imported once
+           when the state file did not exist before
 
         Returns
         =======
 
         """
+        if not re.fullmatch(r"[A-Za-z0-9]{2,}", alphabet) or len(set(alphabet)) != len(
+            alphabet
+        ):
+            raise ValueError(
+                "Message number alphabet must consist of 2..n unique alphanumeric characters"
+            )
+        if not 1 <= length <= APRS_MESSAGE_NUMBER_MAX_LENGTH:
+            raise ValueError(
+                f"Message number length must be between 1 and {APRS_MESSAGE_NUMBER_MAX_LENGTH}"
+            )
+        self.alphabet = alphabet
+        self.length = length
+        self.modulus = len(alphabet) ** length
+        self.per_destination = per_destination
 
-        # Init our future numeric counter
+        # Init our future numeric counter(s). Every destination counter
+        # occupies one of the state file's destination slots
         self.counter = 0
+        self._destination_counters: OrderedDict = OrderedDict()
+        self._destination_slots: dict = {}
+        self._free_slots: list = []
+
+        self.state_file = state_file
+        self.legacy_file_name = legacy_file_name
+        self.fsync = fsync
 
-        # sef the counter's local file name
-        self.file_name: str = build_full_pathname(file_name=file_name)
+        # Background flusher: the state file is msync'ed whenever the
+        # counter has changed (see start_flusher)
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._changed = threading.Event()
+        self._flusher_stop = threading.Event()
+        self._flusher_thread: threading.Thread | None = None
 
-        # and finally, (try to) read the file from disk
+        # and finally, (try to) read the counter from the state file
         self.read_counter()
 
     def read_counter(self):
         """
-        Reads the latest message counter from a file
+        Reads the latest message counter from the state file
         and sets the class' internal counter
 
-        If file is not present, we will start with '0'
+        If the state file did not exist before, the counter is imported
+        from the legacy counter file (if present). Otherwise, we will start
+        with '0'
 
         Parameters
         ==========
@@ -66,24 +171,117 @@ class APRSMessageCounter:
 
         logger.debug(msg="Creating APRS message counter object...")
 
-        # Initially, assume that our source file does not exist
-        self.counter = 0
+        with self._lock, self.state_file.locked():
+            self.counter = self.state_file.get_value("message_counter") % self.modulus
+            self._destination_counters.clear()
+            self._read_destination_slots()
+
+        if self.state_file.created and self.legacy_file_name:
+            self._import_legacy_counter()
 
+    def _read_destination_slots(self):
+        """
+        Reads the destinations' counters from the state file. Destinations
+        which are already known keep their position in the LRU order; new
+        destinations (e.g. from other processes) count as recently used.
+        The caller needs to hold the lock and the state file's lock
+
+        Parameters
+        ==========
+
+        Returns
+        =======
+
+        """
+        stored_counters = {}
+        self._destination_slots.clear()
+        self._free_slots = []
+        for index in range(
+            min(self.state_file.slots, APRS_MESSAGE_COUNTER_MAX_DESTINATIONS)
+        ):
+            slot = self.state_file.get_slot(index)
+            if slot:
+                callsign, value = slot
+                stored_counters[callsign] = value % self.modulus
+                self._destination_slots[callsign] = index
+            else:
+                self._free_slots.append(index)
+        self._free_slots.reverse()
+
+        destination_counters = OrderedDict(
+            (callsign, stored_counters.pop(callsign))
+            for callsign in self._destination_counters
+            if callsign in stored_counters
+        )
+        destination_counters.update(stored_counters)
+        self._destination_counters = destination_counters
+
+    def _read_destination_counter(self, destination: str) -> int | None:
+        """
+        Reads a destination's counter from the state file. As other processes
+        may have reassigned the destination's slot, all slots are read again
+        if the slot no longer belongs to the destination.
+        The caller needs to hold the lock and the state file's lock
+
+        Parameters
+        ==========
+        destination: str
+            Destination call sign
+
+        Returns
+        =======
+        counter: int | None
+            The destination's numeric APRS counter or None if the
+            destination does not have a counter yet
+        """
+        slot = self._destination_slots.get(destination)
+        if slot is not None:
+            stored_slot = self.state_file.get_slot(slot)
+            if stored_slot and stored_slot[0] == destination:
+                return stored_slot[1] % self.modulus
+        self._read_destination_slots()
+        return self._destination_counters.get(destination)
+
+    def _import_legacy_counter(self):
+        """
+        Imports the message counter from the legacy text file
+        File format: the global counter, followed by 0..n lines with
+        a destination call sign and its counter
+
+        Parameters
+        ==========
+
+        Returns
+        =======
+
+        """
         try:
-            with open(f"{self.file_name}", "r") as f:
-                if f.mode == "r":
-                    contents = f.read()
-                    f.close()
-                    self.counter = int(contents)
+            with open(f"{self.legacy_file_name}", "r") as f:
+                contents = f.read().split("\n")
+            counter = int(contents[0]) % self.modulus
+            destination_counters = []
+            for line in contents[1:]:
+                if line.strip():
+                    callsign, value = line.split()
+                    destination_counters.append((callsign, int(value) % self.modulus))
         except (FileNotFoundError, Exception):
-            self.counter = 0
             logger.debug(
-                msg=f"Cannot read content from message counter file {self.file_name}; will create a new file"
+                msg=f"Cannot read content from legacy message counter file {self.legacy_file_name}"
             )
+            return
+
+        with self._lock, self.state_file.locked():
+            self._set_counter(counter=counter)
+            for callsign, value in destination_counters:
+                self._set_destination_counter(destination=callsign, counter=value)
+        logger.debug(
+            msg=f"Imported message counter from legacy file {self.legacy_file_name}"
+        )
 
     def write_counter(self):
         """
-        Writes the latest message counter to a file
+        Writes the latest message counter to disk. As the counter lives
+        in the memory-mapped state file, this is an msync of that file
 
         Parameters
         ==========
@@ -93,12 +291,68 @@ class APRSMessageCounter:
 
         """
         logger.debug(msg="Writing APRS message counter object to disk ...")
-        try:
-            with open(f"{self.file_name}", "w") as f:
-                f.write("%d" % self.counter)
-                f.close()
-        except (IOError, OSError):
-            logger.debug(msg=f"Cannot write message counter to {self.file_name}")
+        with self._lock:
+            self._dirty = False
+        with self.state_file.locked():
+            self.state_file.flush()
+
+    def start_flusher(self, interval_seconds: float):
+        """
+        Starts a background thread which writes the counter to disk
+        whenever it has changed. Changes within 'interval_seconds' are
+        coalesced into a single write, thus keeping the disk I/O off the
+        hot path and cheap at high message rates. The thread is only
+        needed (and started) if 'fsync' is enabled; otherwise, the
+        operating system writes the state file's changes to disk.
+
+        Parameters
+        ==========
+        interval_seconds: float
+           Minimum time span between two writes (unit of measure = seconds).
+           A value of zero writes the counter after every change
+
+        Returns
+        =======
+        """
+        if self._flusher_thread or not self.fsync:
+            return
+
+        def _flusher_loop():
+            while True:
+                self._changed.wait()
+                self._changed.clear()
+                if self._flusher_stop.is_set():
+                    break
+                with self._lock:
+                    dirty = self._dirty
+                if dirty:
+                    self.write_counter()
+                if self._flusher_stop.wait(timeout=interval_seconds):
+                    break
+
+        self._flusher_stop.clear()
+        self._flusher_thread = threading.Thread(
+            target=_flusher_loop, name="aprs_message_counter_flusher", daemon=True
+        )
+        self._flusher_thread.start()
+
+    def stop_flusher(self):
+        """
+        Stops the background flusher thread (if running) and writes
+        the counter to disk
+
+        Parameters
+        ==========
+
+        Returns
+        =======
+        """
+        if self._flusher_thread:
+            self._flusher_stop.set()
+            self._changed.set()
+            self._flusher_thread.join()
+            self._flusher_thread = None
+        self.write_counter()
 
     def get_counter(self):
         """
@@ -115,6 +369,120 @@ class APRSMessageCounter:
         """
         return self.counter
 
+    def allocate(self, count: int = 1, destination: str | None = None) -> int:
+        """
+        Atomically reserves a contiguous block of 'count' message numbers,
+        e.g. for all messages of a reply. Concurrent senders never receive
+        the same message numbers (unless more than 'modulus' numbers are
+        in flight). This also applies to other processes which share the
+        state file as the counters are re-read while holding its file lock.
+
+        Parameters
+        ==========
+        count: int
+            Number of message numbers to reserve
+        destination: str | None
+            Destination call sign. Only used if every destination has
+            its own message number space (see 'per_destination')
+
+        Returns
+        =======
+        first_counter: int
+            The first reserved message number. The block's i-th number is
+            (first_counter + i) % modulus
+        """
+        if count < 1:
+            raise ValueError("count must be a positive number")
+        with self._lock, self.state_file.locked():
+            self.counter = self.state_file.get_value("message_counter") % self.modulus
+            if self.per_destination and destination:
+                # New destinations start at the global counter which keeps
+                # advancing, thus spreading the destinations' numbers
+                first_counter = self._read_destination_counter(destination=destination)
+                if first_counter is None:
+                    first_counter = self.counter
+                self._set_destination_counter(
+                    destination=destination,
+                    counter=(first_counter + count) % self.modulus,
+                )
+            else:
+                first_counter = self.counter
+            self._set_counter(counter=(self.counter + count) % self.modulus)
+            self.state_file.set_value("message_counter_low_watermark", first_counter)
+            self.state_file.set_value("last_allocation_time", time.time())
+        return first_counter
+
+    def _set_counter(self, counter: int):
+        """
+        Sets the counter and stores it in the state file
+        The caller needs to hold the lock
+
+        Parameters
+        ==========
+        counter: int
+            Our numeric APRS counter
+
+        Returns
+        =======
+
+        """
+        self.counter = counter
+        self.state_file.set_value("message_counter", counter)
+        self._dirty = True
+        self._changed.set()
+
+    def _set_destination_counter(self, destination: str, counter: int):
+        """
+        Sets a destination's counter and stores it in the state file. If all
+        slots are in use, the least recently used destination is removed.
+        The caller needs to hold the lock
+
+        Parameters
+        ==========
+        destination: str
+            Destination call sign
+        counter: int
+            The destination's numeric APRS counter
+
+        Returns
+        =======
+
+        """
+        slot = self._destination_slots.get(destination)
+        if slot is None:
+            if not self._free_slots:
+                evicted, _ = self._destination_counters.popitem(last=False)
+                self._free_slots.append(self._destination_slots.pop(evicted))
+            slot = self._free_slots.pop()
+            self._destination_slots[destination] = slot
+        self._destination_counters.pop(destination, None)
+        self._destination_counters[destination] = counter
+        self.state_file.set_slot(index=slot, callsign=destination, value=counter)
+
+    def get_message_number(self, counter: int, length: int | None = None) -> str:
+        """
+        Converts a (reserved) counter value to its alphanumeric
+        APRS message number
+
+        Parameters
+        ==========
+        counter: int
+            Counter value, see allocate
+        length: int | None
+            Message number length; None = the configured length. Shorter
+            lengths (e.g. for the reply-ack format) wrap earlier
+
+        Returns
+        =======
+        message_number: str
+            The alphanumeric APRS message number
+        """
+        return get_alphanumeric_counter_value(
+            numeric_counter=counter,
+            alphabet=self.alphabet,
+            length=min(length or self.length, self.length),
+        )
+
     def set_counter(self, counter: int):
         """
         Setter method for the counter
@@ -129,7 +497,12 @@ class APRSMessageCounter:
 
         """
         if type(counter) is int:
-            self.counter = counter
+            with self._lock, self.state_file.locked():
+                self.counter = (
+                    self.state_file.get_value("message_counter") % self.modulus
+                )
+                if counter != self.counter:
+                    self._set_counter(counter=counter)
         else:
             raise ValueError("Value type must be int")
 
@@ -0,0 +1,195 @@
+#
+# Core APRS Client
+# Pagination of outgoing APRS messages
+# Author: Joerg Schultze-Lutter, 2025
+#
+# Long responses are sent page by page: the first page is sent right away
+# whereas the remaining messages are stored on a per-callsign basis. The
+# user can request the next page by sending the 'more' keyword.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator, Sized
+from itertools import islice
+import threading
+import time
+from .client_logger import logger
+from .client_utils import APRS_MSG_LEN_NOTRAILING
+
+
+class APRSContinuationStore:
+    def __init__(
+        self,
+        page_size: int,
+        more_keyword: str,
+        max_entries: int,
+        max_age_seconds: int,
+    ):
+        """
+        This class implements the per-callsign store for the remaining
+        pages of paginated APRS responses.
+
+        Parameters
+        ==========
+        page_size: int
+           Number of APRS messages per page
+        more_keyword: str
+           Keyword which the user needs to send for requesting the next page
+        max_entries: int
+           Max number of callsigns in the store. If exceeded, the
+           least recently used entry is removed
+        max_age_seconds: int
+           Life span of a stored response (unit of measure = seconds)
+
+        Returns
+        =======
+
+        """
+        self.page_size = max(1, page_size)
+        self.more_keyword = more_keyword.strip()
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def is_more_request(self, message_text: str) -> bool:
+        """
+        Checks if the incoming message text is the 'more' keyword
+
+        Parameters
+        ==========
+        message_text: str
+            The user's message text
+
+        Returns
+        =======
+        is_more_request: bool
+            True if the user requests the next page
+        """
+        return message_text.strip().lower() == self.more_keyword.lower()
+
+    def paginate(self, callsign: str, messages: Iterable[str]) -> tuple | Iterator[str]:
+        """
+        Returns the first page of the (finalized) outgoing messages. The
+        remaining messages are stored for the user's callsign, followed by
+        a hint on how to request them. Any previously stored response of
+        this callsign is replaced.
+
+        For a list or tuple, the first page is returned as a tuple, thus
+        allowing the sender to allocate its message numbers in one go. For
+        a stream, the first page is yielded as soon as its messages arrive.
+
+        Parameters
+        ==========
+        callsign: str
+            The user's callsign
+        messages: Iterable[str]
+            Finalized outgoing messages (list or stream)
+
+        Returns
+        =======
+        message: tuple | Iterator[str]
+            The messages of the first page
+        """
+        if isinstance(messages, Sized):
+            messages = tuple(messages)
+            return messages[: self.page_size] + self._store(
+                callsign=callsign, remainder=messages[self.page_size :]
+            )
+        return self._paginate_stream(callsign=callsign, messages=messages)
+
+    def _paginate_stream(self, callsign: str, messages: Iterable[str]) -> Iterator[str]:
+        """
+        Stream counterpart of paginate
+
+        Parameters
+        ==========
+        callsign: str
+            The user's callsign
+        messages: Iterable[str]
+            Finalized outgoing messages (stream)
+
+        Returns
+        =======
+        message: Iterator[str]
+            The messages of the first page
+        """
+        message_iterator = iter(messages)
+        yield from islice(message_iterator, self.page_size)
+        yield from self._store(callsign=callsign, remainder=tuple(message_iterator))
+
+    def get_next_page(self, callsign: str) -> tuple | None:
+        """
+        Returns the next page of the stored response of a callsign
+
+        Parameters
+        ==========
+        callsign: str
+            The user's callsign
+
+        Returns
+        =======
+        page: tuple | None
+            The messages of the next page or None if there is no (unexpired)
+            response for this callsign
+        """
+        with self._lock:
+            entry = self._entries.pop(callsign, None)
+        if not entry:
+            return None
+        stored_at, remainder = entry
+        if time.monotonic() - stored_at > self.max_age_seconds:
+            logger.debug(msg=f"Stored response for '{callsign}' has expired")
+            return None
+        return remainder[: self.page_size] + self._store(
+            callsign=callsign, remainder=remainder[self.page_size :]
+        )
+
+    def _store(self, callsign: str, remainder: tuple) -> tuple:
+        """
+        Stores the remaining messages for a callsign
+
+        Parameters
+        ==========
+        callsign: str
+            The user's callsign
+        remainder: tuple
+            The remaining messages
+
+        Returns
+        =======
+        trailer: tuple
+            The messages which are to be sent after the current page: a hint
+            on how to request the next page. If only one message remains, it is
+            sent right away as it takes the same air time as the hint
+        """
+        with self._lock:
+            self._entries.pop(callsign, None)
+            if len(remainder) <= 1:
+                return remainder
+            self._entries[callsign] = (time.monotonic(), remainder)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        logger.debug(msg=f"Stored {len(remainder)} remaining messages for '{callsign}'")
+        hint = f"{len(remainder)} more msgs - send '{self.more_keyword}' to continue"
+        return (hint[:APRS_MSG_LEN_NOTRAILING],)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+if __name__ == "__main__":
+    pass
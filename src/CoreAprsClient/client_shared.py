@@ -23,8 +23,12 @@
 #
 
 AIS = None
+aprs_state_file = None
 aprs_message_counter = None
 aprs_message_cache = None
+formatting_profile = None
+aprs_continuation_store = None
+aprs_transmit_queue = None
 
 if __name__ == "__main__":
     pass
@@ -0,0 +1,293 @@
+#
+# Core APRS Client
+# Memory-mapped state file
+# Author: Joerg Schultze-Lutter, 2025
+#
+# Small fixed-layout binary file in the data directory which holds the
+# client's persistent state, e.g. the APRS message counter. The file is
+# memory-mapped; updates are in-place stores which survive a crash of the
+# process (and, if requested, get msync'ed to disk). Other local processes
+# can map the same file in order to read the state cheaply. Processes which
+# share the file for writing (e.g. worker processes which share the data
+# directory) need to hold the file lock while updating it (see 'locked').
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+from .client_logger import logger
+from contextlib import contextmanager
+import mmap
+import os
+import struct
+import threading
+
+# File locks are used for synchronizing the writers of the state file across
+# processes. They are only available on POSIX systems
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Binary layout of the state file:
+# header: magic, file format version, number of destination slots
+# values: see STATE_FILE_FIELDS (all fields are 8 bytes wide and aligned)
+# slots: destination call sign (NUL-padded), message counter
+STATE_FILE_MAGIC = b"COAS"
+STATE_FILE_VERSION = 1
+STATE_FILE_HEADER = struct.Struct("<4sHH")
+STATE_FILE_SLOT = struct.Struct("<16sQ")
+STATE_FILE_SLOTS = 1000
+
+# Fixed value fields: name -> (offset, format)
+STATE_FILE_FIELDS = {
+    # next free message number (high watermark of the allocated numbers)
+    "message_counter": (8, struct.Struct("<Q")),
+    # first message number of the most recent allocation (low watermark)
+    "message_counter_low_watermark": (16, struct.Struct("<Q")),
+    # wall clock time stamps
+    "last_allocation_time": (24, struct.Struct("<d")),
+    "last_connect_time": (32, struct.Struct("<d")),
+    "last_disconnect_time": (40, struct.Struct("<d")),
+}
+STATE_FILE_SLOTS_OFFSET = 48
+
+
+class APRSStateFile:
+    def __init__(
+        self, file_name: str, slots: int = STATE_FILE_SLOTS, read_only: bool = False
+    ):
+        """
+        This class implements the memory-mapped state file. Any number
+        of processes can read from the file (see 'read_only'). Processes
+        which write to the same file need to do so while holding its
+        file lock (see 'locked').
+
+        Parameters
+        ==========
+        file_name: str
+           Full path name of the state file. If the file does not exist
+           or has an unsupported format, a new file is created
+        slots: int
+           Number of destination slots (e.g. for per-destination message
+           counters)
+        read_only: bool
+           True = map an existing file for reading only. Raises a ValueError
+           if the file has an unsupported format
+
+        Returns
+        =======
+
+        """
+        self.file_name = file_name
+        self.slots = slots
+        self.size = STATE_FILE_SLOTS_OFFSET + slots * STATE_FILE_SLOT.size
+
+        # Flag which tells the caller whether the file did not exist
+        # before (e.g. for migrating legacy state data). A file which gets
+        # initialized again due to an unsupported format does not count
+        self.created = False
+
+        self._fd = None
+        self._thread_lock = threading.Lock()
+
+        if read_only:
+            fd = os.open(file_name, os.O_RDONLY)
+            try:
+                if os.fstat(fd).st_size != self.size:
+                    raise ValueError("Unsupported state file format")
+                self._mmap = mmap.mmap(fd, self.size, access=mmap.ACCESS_READ)
+            finally:
+                os.close(fd)
+        else:
+            # The file descriptor stays open for the file lock
+            self._fd = os.open(file_name, os.O_RDWR | os.O_CREAT, 0o644)
+            if not fcntl:
+                logger.warning(
+                    msg="File locks are not supported on this platform; the state file must not be shared with other processes"
+                )
+            with self.locked():
+                file_size = os.fstat(self._fd).st_size
+                self.created = file_size == 0
+                if file_size != self.size:
+                    os.ftruncate(self._fd, self.size)
+                self._mmap = mmap.mmap(self._fd, self.size)
+                self._check_header()
+            return
+
+        self._check_header()
+
+    def _check_header(self):
+        """
+        Checks the state file's header and initializes the file if it has
+        an unsupported format. Writers need to hold the file lock
+
+        Parameters
+        ==========
+
+        Returns
+        =======
+        """
+        magic, version, file_slots = STATE_FILE_HEADER.unpack_from(self._mmap, 0)
+        if (
+            magic != STATE_FILE_MAGIC
+            or version != STATE_FILE_VERSION
+            or file_slots != self.slots
+        ):
+            if self._fd is None:
+                self._mmap.close()
+                raise ValueError("Unsupported state file format")
+            logger.debug(msg=f"Initializing state file {self.file_name}")
+            self._mmap[:] = bytes(self.size)
+            STATE_FILE_HEADER.pack_into(
+                self._mmap, 0, STATE_FILE_MAGIC, STATE_FILE_VERSION, self.slots
+            )
+
+    @contextmanager
+    def locked(self):
+        """
+        Holds the state file's lock, meaning that no other thread or
+        process which shares the state file writes to it in the meantime.
+        Read-modify-write sequences (e.g. the allocation of message numbers)
+        need to re-read the state while holding the lock as other processes
+        may have changed it
+
+        Parameters
+        ==========
+
+        Returns
+        =======
+        """
+        with self._thread_lock:
+            if fcntl and self._fd is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl and self._fd is not None:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def get_value(self, name: str) -> int | float:
+        """
+        Reads a value from the state file
+
+        Parameters
+        ==========
+        name: str
+            Field name, see STATE_FILE_FIELDS
+
+        Returns
+        =======
+        value: int | float
+            The field's value
+        """
+        offset, field = STATE_FILE_FIELDS[name]
+        return field.unpack_from(self._mmap, offset)[0]
+
+    def set_value(self, name: str, value: int | float):
+        """
+        Stores a value in the state file
+
+        Parameters
+        ==========
+        name: str
+            Field name, see STATE_FILE_FIELDS
+        value: int | float
+            The field's new value
+
+        Returns
+        =======
+        """
+        offset, field = STATE_FILE_FIELDS[name]
+        field.pack_into(self._mmap, offset, value)
+
+    def get_slot(self, index: int) -> tuple[str, int] | None:
+        """
+        Reads a destination slot from the state file
+
+        Parameters
+        ==========
+        index: int
+            Slot index (0..slots-1)
+
+        Returns
+        =======
+        slot: tuple[str, int] | None
+            Call sign and value of the slot or None if the slot is empty
+        """
+        callsign, value = STATE_FILE_SLOT.unpack_from(
+            self._mmap, STATE_FILE_SLOTS_OFFSET + index * STATE_FILE_SLOT.size
+        )
+        callsign = callsign.rstrip(b"\0")
+        if not callsign:
+            return None
+        return callsign.decode("ascii", errors="replace"), value
+
+    def set_slot(self, index: int, callsign: str | None, value: int = 0):
+        """
+        Stores a destination slot in the state file
+
+        Parameters
+        ==========
+        index: int
+            Slot index (0..slots-1)
+        callsign: str | None
+            Call sign of the slot; None = clear the slot
+        value: int
+            Value of the slot
+
+        Returns
+        =======
+        """
+        STATE_FILE_SLOT.pack_into(
+            self._mmap,
+            STATE_FILE_SLOTS_OFFSET + index * STATE_FILE_SLOT.size,
+            (callsign or "").encode("ascii", errors="replace"),
+            value,
+        )
+
+    def flush(self):
+        """
+        Writes all changes to disk (msync)
+
+        Parameters
+        ==========
+
+        Returns
+        =======
+        """
+        try:
+            self._mmap.flush()
+        except (IOError, OSError, ValueError):
+            logger.debug(msg=f"Cannot flush state file {self.file_name}")
+
+    def close(self):
+        """
+        Writes all changes to disk and closes the state file
+
+        Parameters
+        ==========
+
+        Returns
+        =======
+        """
+        if not self._mmap.closed:
+            self.flush()
+            self._mmap.close()
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,190 @@
+#
+# Core APRS Client
+# Outbound transmit queue for beacons and bulletins
+# Author: Joerg Schultze-Lutter, 2025
+#
+# The beacon and bulletin jobs run in the scheduler's worker threads. Rather
+# than sending their frames (and sleeping between them) themselves, they
+# hand them over to this queue and return right away. A single worker
+# thread sends the frames to APRS-IS and applies the delays of the frames'
+# pacing class. Stopping the queue wakes up the worker at once; frames
+# which have not been sent yet are discarded.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+from collections.abc import Iterable, Mapping
+import queue
+import threading
+from .client_aprsobject import APRSISObject
+from .client_logger import logger
+
+# Pacing classes of the outgoing frames
+APRS_PACING_BEACON = "beacon"
+APRS_PACING_BULLETIN = "bulletin"
+
+# Max wait time (unit of measure = seconds) for the worker thread
+# during shutdown
+APRS_TRANSMIT_QUEUE_STOP_TIMEOUT = 5.0
+
+
+class APRSTransmitQueue:
+    def __init__(
+        self,
+        myaprsis: APRSISObject,
+        pacing: Mapping[str, float],
+        grace_period: float,
+        simulate_send: bool = True,
+    ):
+        """
+        This class implements the outbound queue for beacons and bulletins
+
+        Parameters
+        ==========
+        myaprsis: APRSISObject
+           Our aprslib object that we will use for the communication part
+        pacing: Mapping[str, float]
+           Pacing classes: delay between two frames of the same batch
+           (unit of measure = seconds), e.g. {"bulletin": 6.0}
+        grace_period: float
+           Delay after the very last frame of a batch
+           (unit of measure = seconds)
+        simulate_send: bool
+           If True: Prepare string but only send it to logger
+
+        Returns
+        =======
+
+        """
+        self.myaprsis = myaprsis
+        self.pacing = dict(pacing)
+        self.grace_period = grace_period
+        self.simulate_send = simulate_send
+        self._queue: queue.Queue = queue.Queue()
+        # frames which are waiting for their transmission; prevents us from
+        # queueing the same frame twice if a job fires while its previous
+        # batch is still being sent
+        self._pending: set = set()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        """
+        Starts the worker thread
+
+        Parameters
+        ==========
+
+        Returns
+        =======
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="aprs-transmit-queue", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        """
+        Stops the worker thread and discards all pending frames
+
+        Parameters
+        ==========
+
+        Returns
+        =======
+        """
+        self._stop_event.set()
+        self._queue.put(None)
+        if self._thread is not None:
+            self._thread.join(timeout=APRS_TRANSMIT_QUEUE_STOP_TIMEOUT)
+            self._thread = None
+        with self._lock:
+            if self._pending:
+                logger.debug(msg=f"Discarding {len(self._pending)} pending frames")
+            self._pending.clear()
+
+    def enqueue(self, frames: Iterable[str], pacing_class: str) -> int:
+        """
+        Adds a batch of frames to the queue
+
+        Parameters
+        ==========
+        frames: Iterable[str]
+            Ready-to-send APRS frames
+        pacing_class: str
+            Pacing class of the frames, e.g. APRS_PACING_BULLETIN
+
+        Returns
+        =======
+        enqueued: int
+            Number of frames which have been added to the queue. Frames
+            which are still pending are not added again
+        """
+        if pacing_class not in self.pacing:
+            raise ValueError(f"Unknown pacing class '{pacing_class}'")
+        if self._stop_event.is_set():
+            return 0
+        with self._lock:
+            batch = tuple(frame for frame in frames if frame not in self._pending)
+            self._pending.update(batch)
+        if batch:
+            self._queue.put((batch, pacing_class))
+        return len(batch)
+
+    def _run(self):
+        """
+        Worker thread: sends the queued frames and applies the delays
+
+        Parameters
+        ==========
+
+        Returns
+        =======
+        """
+        while not self._stop_event.is_set():
+            item = self._queue.get()
+            if item is None:
+                break
+            batch, pacing_class = item
+            for index, frame in enumerate(batch, start=1):
+                if self._stop_event.is_set():
+                    return
+                with self._lock:
+                    self._pending.discard(frame)
+                # simulate sending yes/no
+                if not self.simulate_send:
+                    logger.debug(msg=f"Sending {pacing_class}: {frame}")
+                    try:
+                        self.myaprsis.ais_send(aprsis_data=frame)
+                    except Exception as ex:
+                        logger.error(msg=f"Cannot send {pacing_class}: {ex}")
+                else:
+                    logger.debug(msg=f"Simulating {pacing_class}: {frame}")
+                # apply sleep cycle(s): regular delay between the frames of
+                # a batch, shorter grace period after the very last frame
+                if index < len(batch):
+                    delay = self.pacing[pacing_class]
+                else:
+                    delay = self.grace_period
+                if self._stop_event.wait(delay):
+                    return
+
+    def __len__(self):
+        return len(self._pending)
+
+
+if __name__ == "__main__":
+    pass
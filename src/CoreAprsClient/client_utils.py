@@ -17,17 +17,24 @@
 # with this program; if not, write to the Free Software Foundation, Inc.,
 # 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 #
-from expiringdict import ExpiringDict
 import datetime
 import hashlib
+import logging
 import os
 from unidecode import unidecode
 import argparse
 import zipfile
 import apprise
 import re
+import math
+import functools
+import threading
+import types
+from dataclasses import dataclass
+from collections.abc import Iterable, Iterator, Mapping
 from .client_configuration import program_config
 from .client_logger import logger
+from .client_compaction import APRSTextCompactor
 import sys
 
 # These are global variables which will be used
@@ -47,70 +54,130 @@ ex_type = ex_value = ex_traceback = None
 APRS_MSG_LEN_TRAILING = 59
 APRS_MSG_LEN_NOTRAILING = 67
 
+# Characters which are not permitted in APRS message texts
+# Details: see APRS specification pg. 71
+APRS_NON_PERMITTED_CHARS = re.compile("[{}|~]+")
 
-def _get_aprs_msg_len() -> int:
+# Max number of tokens in the transliteration cache
+# (see convert_text_to_plain_ascii)
+TRANSLITERATION_CACHE_SIZE = 4096
+
+# Max number of message strings in the formatted reply cache
+# (see get_formatted_static_aprs_messages)
+FORMATTED_REPLY_CACHE_SIZE = 256
+
+
+class CoreAprsClientStaticMessage(str):
+    """
+    Marks the output generator's message string as static content (e.g. a
+    help text) which is sent over and over again. Its final APRS messages
+    are kept in the formatted reply cache (see
+    get_formatted_static_aprs_messages)
+    """
+
+
+@dataclass(frozen=True)
+class FormattingProfile:
+    """
+    Immutable formatting settings for outgoing APRS messages. The profile
+    gets built once after the program configuration has been loaded (see
+    build_formatting_profile) and is then passed to the formatting functions.
+
+    Attributes
+    ==========
+    max_len: int
+        Maximum length of a single APRS message's content
+        trailing message no enabled: 59
+        trailing message no disabled: 67
+    enumeration: bool
+        True = add trailing message numbers to multi-part messages
+    unicode_messages: bool
+        True = outgoing UTF-8 content is sent out 'as is'
+        False = outgoing UTF-8 content is down-converted to ASCII content
+    optimal_segmentation: bool
+        True = distribute the content across as few messages as possible
+    non_permitted_chars: re.Pattern
+        Precompiled sanitizer for characters that are not permitted in
+        APRS message texts
+    compactor: APRSTextCompactor | None
+        Compaction stage for outgoing responses (None = disabled)
+    """
+
+    max_len: int
+    enumeration: bool
+    unicode_messages: bool
+    optimal_segmentation: bool
+    non_permitted_chars: re.Pattern = APRS_NON_PERMITTED_CHARS
+    compactor: APRSTextCompactor | None = None
+
+
+def build_formatting_profile() -> FormattingProfile:
     """
-    Internal helper function which determines the maximum length of a single APRS message.
-    The corresponding value is dependent on whether the user has activated trailing
-    message numbers for the outgoing APRS message or not.
+    Builds the formatting profile from the program configuration.
+    Needs to be called after the configuration has been loaded.
 
     Parameters
     ==========
 
     Returns
     =======
-    aprs_msg_len: int
-        trailing message no enabled: 59
-        trailing message no disabled: 67
+    formatting_profile: FormattingProfile
+        The formatting settings for outgoing APRS messages
     """
-    if "__main__" not in sys.modules:
-        return (
-            APRS_MSG_LEN_TRAILING
-            if program_config["coac_client_config"]["aprs_message_enumeration"]
-            else APRS_MSG_LEN_NOTRAILING
+    enumeration = program_config["coac_client_config"]["aprs_message_enumeration"]
+
+    compactor = None
+    compaction_config = program_config["coac_compaction"]
+    if compaction_config["compaction_enabled"]:
+        compactor = APRSTextCompactor(
+            abbreviations=program_config.get("coac_compaction_dictionary", {}),
+            collapse_whitespace=compaction_config["compaction_collapse_whitespace"],
+            compact_numbers=compaction_config["compaction_compact_numbers"],
         )
-    else:
-        return APRS_MSG_LEN_TRAILING
 
+    return FormattingProfile(
+        max_len=APRS_MSG_LEN_TRAILING if enumeration else APRS_MSG_LEN_NOTRAILING,
+        enumeration=enumeration,
+        unicode_messages=program_config["coac_testing"][
+            "aprsis_enforce_unicode_messages"
+        ],
+        optimal_segmentation=program_config["coac_client_config"][
+            "aprs_message_optimal_segmentation"
+        ],
+        compactor=compactor,
+    )
 
-def add_aprs_message_to_cache(
-    message_text: str, message_no: str, target_callsign: str, aprs_cache: ExpiringDict
-):
+
+def get_aprs_message_cache_key(
+    message_text: str, message_no: str | None, target_callsign: str
+) -> int:
     """
-    Creates an entry in our expiring dictionary cache. Later on,
-    we can check for this entry and see if a certain message has already been sent
-    within the past x minutes (setting is specified as part of the definition of the
-    ExpiringDict). If we find that entry in our list before that entry has expired,
-    we will not send it out again and consider the request to be fulfilled
+    Builds the dupe detection key for an incoming APRS message. The key
+    is calculated once per packet and then used for both cache lookup and
+    cache insert.
+
     Parameters
     ==========
     message_text: str
         APRS message (as extracted from the original incoming message)
-    message_no: str
+    message_no: str | None
         APRS message number (or 'None' if not present)
     target_callsign: str
         Call sign of the user who has sent this message
-    aprs_cache: ExpiringDict
-        Reference to the ExpiringDict cache
+
     Returns
     =======
-    aprs_cache: ExpiringDict
-        Reference to the ExpiringDict cache, now containing our entry
+    key: int
+        64 bit integer digest of message text, call sign and message number
     """
-    # Create message key which consists of:
-    # - an md5-ed version of the message text (save some bytes on storage)
-    #   Conversion to string is necessary; otherwise, the lookup won't work
-    # - the user's call sign
-    # - the message number (note that this field's content can be 'None')
-    md5_hash = hashlib.md5(message_text.encode("utf-8")).hexdigest()
-    key = (md5_hash, target_callsign, message_no)
-    # Finally, build the key. Convert it to a tuple as the key needs to be immutable
-    key = tuple(key)
-
-    # Add the Key to our expiring cache. The datetime stamp is not used; we
-    # just need to give the dictionary entry a value
-    aprs_cache[key] = datetime.datetime.now()
-    return aprs_cache
+    # The key consists of the message text, the user's call sign and the
+    # message number (which can be 'None'). All fields are separated by a
+    # NUL character which cannot be part of an APRS message; hash all of them
+    # in one go and keep an 8 byte digest as fixed-width integer. This saves
+    # the 32 byte hex string and the tuple object per cache entry.
+    _key_data = f"{message_text}\x00{target_callsign}\x00{message_no or ''}"
+    _digest = hashlib.blake2b(_key_data.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(_digest, "big")
 
 
 def check_if_file_exists(file_name: str):
@@ -129,58 +196,49 @@ def check_if_file_exists(file_name: str):
     return os.path.isfile(file_name)
 
 
-def get_aprs_message_from_cache(
-    message_text: str, message_no: str, target_callsign: str, aprs_cache: ExpiringDict
-):
+def dump_string_to_hex(message_text_string: str):
     """
-    Checks for an entry in our expiring dictionary cache.
+    Converts string to hex format and returns that content to the user.
     If we find that entry in our list before that entry has expired,
     we consider the request to be fulfilled and will not process it again
     Parameters
     ==========
-    message_text: str
-        APRS message (as extracted from the original incoming message)
-    message_no: str
-        APRS message number (or 'None' if not present)
-    target_callsign: str
-        Call sign of the user who has sent this message
-    aprs_cache: ExpiringDict
-        Reference to the ExpiringDict cache
+    message_text_string: str
+        Text that needs to be converted
     Returns
     =======
-    key: 'Tuple'
-        Key tuple (or 'None' if not found / no longer present)
+    hex-converted text to the user
     """
-    # Create message key which consists of:
-    # - an md5-ed version of the message text (save some bytes on storage)
-    #   Conversion to string is necessary; otherwise, the lookup won't work
-    # - the user's call sign
-    # - the message number (note that this field's content can be 'None')
-    md5_hash = hashlib.md5(message_text.encode("utf-8")).hexdigest()
-    key = (md5_hash, target_callsign, message_no)
-    # Finally, build the key. Convert it to a tuple as the key needs to be immutable
-    key = tuple(key)
-
-    if key in aprs_cache:
-        return key
-    else:
-        return None
+    return "".join(hex(ord(c))[2:] for c in message_text_string)
 
 
-def dump_string_to_hex(message_text_string: str):
+@functools.lru_cache(maxsize=TRANSLITERATION_CACHE_SIZE)
+def _convert_token_to_plain_ascii(token: str) -> str:
     """
-    Converts string to hex format and returns that content to the user.
-    If we find that entry in our list before that entry has expired,
-    we consider the request to be fulfilled and will not process it again
+    Converts a single (non-ASCII) token to plain ASCII. The results are
+    kept in a bounded LRU cache as bots tend to transliterate the same
+    words over and over again.
+
     Parameters
     ==========
-    message_text_string: str
-        Text that needs to be converted
+    token: str
+        Token that needs to be converted
+
     Returns
     =======
-    hex-converted text to the user
+    token: str
+        plain ASCII token
     """
-    return "".join(hex(ord(c))[2:] for c in message_text_string)
+    token = (
+        token.replace("Ä", "Ae")
+        .replace("Ö", "Oe")
+        .replace("Ü", "Ue")
+        .replace("ä", "ae")
+        .replace("ö", "oe")
+        .replace("ü", "ue")
+        .replace("ß", "ss")
+    )
+    return unidecode(token)
 
 
 def convert_text_to_plain_ascii(message_string: str):
@@ -194,17 +252,38 @@ def convert_text_to_plain_ascii(message_string: str):
     =======
     hex-converted text to the user
     """
-    message_string = (
-        message_string.replace("Ä", "Ae")
-        .replace("Ö", "Oe")
-        .replace("Ü", "Ue")
-        .replace("ä", "ae")
-        .replace("ö", "oe")
-        .replace("ü", "ue")
-        .replace("ß", "ss")
+    # Fast path: there is nothing to convert for plain ASCII content
+    if message_string.isascii():
+        return message_string
+
+    # Both the replacements and unidecode convert character by character,
+    # so we can convert word by word and benefit from the token cache
+    return " ".join(
+        token if token.isascii() else _convert_token_to_plain_ascii(token)
+        for token in message_string.split(" ")
     )
-    message_string = unidecode(message_string)
-    return message_string
+
+
+def get_transliteration_cache_statistics() -> dict:
+    """
+    Returns the statistics of the transliteration cache
+    (see convert_text_to_plain_ascii)
+
+    Parameters
+    ==========
+
+    Returns
+    =======
+    statistics: dict
+        hits, misses, current size and max size of the cache
+    """
+    cache_info = _convert_token_to_plain_ascii.cache_info()
+    return {
+        "hits": cache_info.hits,
+        "misses": cache_info.misses,
+        "size": cache_info.currsize,
+        "max_size": cache_info.maxsize,
+    }
 
 
 def get_command_line_params():
@@ -445,8 +524,9 @@ def check_and_create_data_directory(
 
 def make_pretty_aprs_messages(
     message_to_add: str,
+    formatting_profile: FormattingProfile,
     destination_list: list = None,
-    max_len: int = _get_aprs_msg_len(),
+    max_len: int = None,
     separator_char: str = " ",
     add_sep: bool = True,
     force_outgoing_unicode_messages: bool = False,
@@ -493,6 +573,8 @@ def make_pretty_aprs_messages(
     message_to_add: str
         message string that is to be added to the list in a pretty way
         If string is longer than 67 chars, we will truncate the information
+    formatting_profile: FormattingProfile
+        The formatting settings, see build_formatting_profile
     destination_list: list
         List with string elements which will be enriched with the
         'mesage_to_add' string. Default: empty list aka user wants new list
@@ -501,7 +583,7 @@ def make_pretty_aprs_messages(
         The length is dependent on whether the user has activated trailing
         message number information in the outgoing message or not.
         When activated, the message length is 59 - otherwise, it is 67.
-        _get_aprs_msg_len() auto-determines the appropriate value.
+        Default: None = use the formatting profile's max_len value
     separator_char: str
         Separator that is going to be used for dividing the single
         elements that the user is going to add
@@ -528,69 +610,436 @@ def make_pretty_aprs_messages(
     if not destination_list:
         destination_list = []
 
+    if max_len is None:
+        max_len = formatting_profile.max_len
+
     # replace non-permitted APRS characters from the
     # message text as APRS-IS might choke on this content
     # Details: see APRS specification pg. 71
-    message_to_add = re.sub("[{}|~]+", "", message_to_add)
+    message_to_add = formatting_profile.non_permitted_chars.sub("", message_to_add)
 
     # Check if the user wants unicode messages. Default is ASCII
-    if (
-        not program_config["coac_testing"]["aprsis_enforce_unicode_messages"]
-        and not force_outgoing_unicode_messages
-    ):
+    outgoing_unicode = (
+        formatting_profile.unicode_messages or force_outgoing_unicode_messages
+    )
+    if not outgoing_unicode:
         # Convert the message to plain ascii
         # Unidecode does not take care of German special characters
         # Therefore, we need to 'translate' them first
         message_to_add = convert_text_to_plain_ascii(message_string=message_to_add)
 
-    # If new message is longer than max len then split it up with
-    # max chunks of max_len bytes and add it to the array.
-    # This should never happen but better safe than sorry.
-    # Keep in mind that we only transport plain text anyway.
-    if len(message_to_add) > max_len:
-        split_data = message_to_add.split()
-        for split in split_data:
-            # if string is short enough then add it by calling ourself
-            # with the smaller text chunk
-            if len(split) < max_len:
-                destination_list = make_pretty_aprs_messages(
-                    message_to_add=split,
-                    destination_list=destination_list,
-                    max_len=max_len,
+    # Short content is inserted as a single token. If the new message is
+    # longer than max len, we split it up into its words and insert them
+    # one by one. Words that are too long for a single message get split
+    # up into max_len chunks. The whole content is processed in a single
+    # pass; sanitizing and ASCII conversion have already been done above.
+    # Unicode content is measured in UTF-8 bytes as the APRS message length
+    # limit is a byte limit
+    text_len = _get_utf8_len if outgoing_unicode else len
+    if text_len(message_to_add) > max_len:
+        tokens = _get_aprs_message_tokens(
+            message_string=message_to_add,
+            max_len=max_len,
+            non_permitted_chars=(
+                None if outgoing_unicode else formatting_profile.non_permitted_chars
+            ),
+            utf8=outgoing_unicode,
+        )
+    else:
+        tokens = [(message_to_add, False)]
+
+    # Pack the tokens into the message lines. The greedy packer is the
+    # default; the optimal packer minimizes the number of outgoing
+    # messages (see _pack_aprs_message_tokens_optimal)
+    if formatting_profile.optimal_segmentation:
+        _pack_aprs_message_tokens_optimal(
+            tokens=tokens,
+            destination_list=destination_list,
+            max_len=max_len,
+            separator_char=separator_char,
+            add_sep=add_sep,
+            utf8=outgoing_unicode,
+        )
+    else:
+        _pack_aprs_message_tokens_greedy(
+            tokens=tokens,
+            destination_list=destination_list,
+            max_len=max_len,
+            separator_char=separator_char,
+            add_sep=add_sep,
+            utf8=outgoing_unicode,
+        )
+
+    return destination_list
+
+
+def _pack_aprs_message_tokens_greedy(
+    tokens: list,
+    destination_list: list,
+    max_len: int,
+    separator_char: str,
+    add_sep: bool,
+    utf8: bool = False,
+):
+    """
+    Greedy packer for make_pretty_aprs_messages: every token is added to
+    the current message line as long as it fits; otherwise, a new message
+    line is started. Tokens which need to be force-split are split up into
+    max_len chunks, starting with a new message line.
+
+    Parameters
+    ==========
+    tokens: list
+        (token, force_split) tuples, see _get_aprs_message_tokens
+    destination_list: list
+        List with string elements which will be enriched with the tokens
+        (modified in place)
+    max_len: int:
+        Max length of the list's string len.
+    separator_char: str
+        Separator that is going to be used for dividing the single tokens
+    add_sep: bool
+        True = we will add the separator when more than one item
+               is in our string.
+    utf8: bool
+        True = measure the length in UTF-8 bytes rather than in characters
+
+    Returns
+    =======
+    """
+    # Start with the very last element from the list (if present) and
+    # collect its new content in a buffer; the buffer gets joined only
+    # once the message line is complete
+    text_len = _get_utf8_len if utf8 else len
+
+    line_parts = None
+    line_len = 0
+    if len(destination_list) > 0:
+        string_from_list = destination_list.pop()
+        line_parts = [string_from_list]
+        line_len = text_len(string_from_list)
+
+    for token, force_split in tokens:
+        if force_split:
+            # string exceeds max len; split it up and add it as is
+            if line_parts is not None:
+                destination_list.append("".join(line_parts))
+            string_list = split_string_to_string_list(
+                message_string=token, max_len=max_len, utf8=utf8
+            )
+            destination_list.extend(string_list[:-1])
+            line_parts = [string_list[-1]]
+            line_len = text_len(string_list[-1])
+        elif line_parts is None:
+            line_parts = [token]
+            line_len = text_len(token)
+        # element + new string > max len? no: add to existing string, else create new element in list
+        elif line_len + text_len(token) + 1 <= max_len:
+            if line_len > 0 and add_sep:
+                line_parts.append(separator_char)
+                line_len += text_len(separator_char)
+            line_parts.append(token)
+            line_len += text_len(token)
+        else:
+            destination_list.append("".join(line_parts))
+            line_parts = [token]
+            line_len = text_len(token)
+
+    if line_parts is not None:
+        destination_list.append("".join(line_parts))
+
+
+def _pack_aprs_message_tokens_optimal(
+    tokens: list,
+    destination_list: list,
+    max_len: int,
+    separator_char: str,
+    add_sep: bool,
+    utf8: bool = False,
+):
+    """
+    Optimal packer for make_pretty_aprs_messages. Differences to the
+    greedy packer:
+
+    - the exact separator length is used for the line length check
+      (the greedy packer always reserves one character)
+    - runs of regular tokens are broken into message lines via dynamic
+      programming (see _get_optimal_aprs_message_lines): minimum number
+      of message lines first, then the shortest possible last line
+      (leaving room for subsequent content), then the most even lines
+    - tokens which need to be force-split fill up the remainder of the
+      current message line - but only if this saves a message line
+
+    Parameters
+    ==========
+    tokens: list
+        (token, force_split) tuples, see _get_aprs_message_tokens
+    destination_list: list
+        List with string elements which will be enriched with the tokens
+        (modified in place)
+    max_len: int:
+        Max length of the list's string len.
+    separator_char: str
+        Separator that is going to be used for dividing the single tokens
+    add_sep: bool
+        True = we will add the separator when more than one item
+               is in our string.
+    utf8: bool
+        True = measure the length in UTF-8 bytes rather than in characters
+
+    Returns
+    =======
+    """
+    text_len = _get_utf8_len if utf8 else len
+
+    current_line = None
+    if len(destination_list) > 0:
+        current_line = destination_list.pop()
+
+    start = 0
+    while start < len(tokens):
+        # Collect the run of regular tokens up to the next force-split token
+        end = start
+        while end < len(tokens) and not tokens[end][1]:
+            end += 1
+
+        if end > start:
+            lines = _get_optimal_aprs_message_lines(
+                words=[token for token, _ in tokens[start:end]],
+                prefix=current_line,
+                max_len=max_len,
+                separator_char=separator_char,
+                add_sep=add_sep,
+                utf8=utf8,
+            )
+            destination_list.extend(lines[:-1])
+            current_line = lines[-1]
+
+        if end < len(tokens):
+            token = tokens[end][0]
+            if current_line is not None:
+                delimiter = separator_char if len(current_line) > 0 and add_sep else ""
+                remaining = max_len - text_len(current_line) - text_len(delimiter)
+                token_len = text_len(token)
+                if remaining > 0 and math.ceil(
+                    (token_len - remaining) / max_len
+                ) < math.ceil(token_len / max_len):
+                    head, token = _split_text_at_len(
+                        message_string=token, max_len=remaining, utf8=utf8
+                    )
+                    if head:
+                        current_line = current_line + delimiter + head
+                if token:
+                    destination_list.append(current_line)
+            if token:
+                string_list = split_string_to_string_list(
+                    message_string=token, max_len=max_len, utf8=utf8
+                )
+                destination_list.extend(string_list[:-1])
+                current_line = string_list[-1]
+
+        start = end + 1
+
+    if current_line is not None:
+        destination_list.append(current_line)
+
+
+def _get_optimal_aprs_message_lines(
+    words: list,
+    prefix: str | None,
+    max_len: int,
+    separator_char: str,
+    add_sep: bool,
+    utf8: bool = False,
+) -> list:
+    """
+    Break a list of words into message lines (Knuth-Plass style dynamic
+    programming). Every word is shorter than max_len. The result is chosen
+    by (in that order):
+
+    - the minimum number of message lines
+    - the shortest last message line
+    - the minimum sum of squared free space of all other message lines
+
+    Parameters
+    ==========
+    words: list
+        List of words which are to be distributed across the message lines
+    prefix: str | None
+        Content of the current (last) message line; the first words may be
+        appended to it. None = no current message line present
+    max_len: int:
+        Max length of the list's string len.
+    separator_char: str
+        Separator that is going to be used for dividing the single words
+    add_sep: bool
+        True = we will add the separator when more than one item
+               is in our string.
+    utf8: bool
+        True = measure the length in UTF-8 bytes rather than in characters
+
+    Returns
+    =======
+    lines: list
+        List of 1..n message lines; the first one includes the prefix
+    """
+    text_len = _get_utf8_len if utf8 else len
+    separator_len = text_len(separator_char) if add_sep else 0
+    word_lens = [text_len(word) for word in words]
+    word_count = len(words)
+
+    # best[j]: (line count, squared free space, start of the line) for the
+    # words[:j], with the last line ending straight after words[j - 1].
+    # A line start of -1 represents the prefix line.
+    best = [None] * (word_count + 1)
+
+    # Candidates for the very last line: (line count, length of the last
+    # line, squared free space of all other lines, start of the last line)
+    last_line_candidates = []
+
+    if prefix is None:
+        best[0] = (0, 0, None)
+    else:
+        width = text_len(prefix)
+        best[0] = (1, (max_len - width) ** 2, -1)
+        for j in range(1, word_count + 1):
+            width += (separator_len if width > 0 else 0) + word_lens[j - 1]
+            if width > max_len:
+                break
+            best[j] = (1, (max_len - width) ** 2, -1)
+            if j == word_count:
+                last_line_candidates.append((1, width, 0, -1))
+
+    for i in range(word_count):
+        if best[i] is None:
+            continue
+        line_count, free_space, _ = best[i]
+        width = 0
+        for j in range(i + 1, word_count + 1):
+            width += (separator_len if width > 0 else 0) + word_lens[j - 1]
+            if width > max_len:
+                break
+            if j == word_count:
+                last_line_candidates.append((line_count + 1, width, free_space, i))
+            candidate = (line_count + 1, free_space + (max_len - width) ** 2, i)
+            if best[j] is None or candidate[:2] < best[j][:2]:
+                best[j] = candidate
+
+    # Walk back from the best last line to the first line
+    start = min(last_line_candidates)[3]
+    end = word_count
+    lines = []
+    while True:
+        if start == -1:
+            lines.append(
+                _join_aprs_message_words(
+                    words=words[:end],
+                    prefix=prefix,
                     separator_char=separator_char,
                     add_sep=add_sep,
-                    force_outgoing_unicode_messages=force_outgoing_unicode_messages,
-                )
-            else:
-                # string exceeds max len; split it up and add it as is
-                string_list = split_string_to_string_list(
-                    message_string=split, max_len=max_len
                 )
-                for msg in string_list:
-                    destination_list.append(msg)
-    else:  # try to insert
-        # Get very last element from list
-        if len(destination_list) > 0:
-            string_from_list = destination_list[-1]
-
-            # element + new string > max len? no: add to existing string, else create new element in list
-            if len(string_from_list) + len(message_to_add) + 1 <= max_len:
-                delimiter = ""
-                if len(string_from_list) > 0 and add_sep:
-                    delimiter = separator_char
-                string_from_list = string_from_list + delimiter + message_to_add
-                destination_list[-1] = string_from_list
-            else:
-                destination_list.append(message_to_add)
-        else:
-            destination_list.append(message_to_add)
+            )
+            break
+        lines.append(
+            _join_aprs_message_words(
+                words=words[start:end],
+                prefix=None,
+                separator_char=separator_char,
+                add_sep=add_sep,
+            )
+        )
+        if start == 0 and prefix is None:
+            break
+        end = start
+        start = best[start][2]
 
-    return destination_list
+    lines.reverse()
+    return lines
 
 
-def split_string_to_string_list(
-    message_string: str, max_len: int = _get_aprs_msg_len()
-):
+def _join_aprs_message_words(
+    words: list, prefix: str | None, separator_char: str, add_sep: bool
+) -> str:
+    """
+    Join words into a single message line, applying the same separator
+    rules as make_pretty_aprs_messages
+
+    Parameters
+    ==========
+    words: list
+        List of words
+    prefix: str | None
+        Current content of the message line (if present)
+    separator_char: str
+        Separator that is going to be used for dividing the single words
+    add_sep: bool
+        True = we will add the separator when more than one item
+               is in our string.
+
+    Returns
+    =======
+    line: str
+        The message line
+    """
+    line_parts = []
+    line_len = 0
+    if prefix is not None:
+        line_parts.append(prefix)
+        line_len = len(prefix)
+    for word in words:
+        if line_len > 0 and add_sep:
+            line_parts.append(separator_char)
+            line_len += len(separator_char)
+        line_parts.append(word)
+        line_len += len(word)
+    return "".join(line_parts)
+
+
+def _get_aprs_message_tokens(
+    message_string: str,
+    max_len: int,
+    non_permitted_chars: re.Pattern | None,
+    utf8: bool = False,
+) -> list:
+    """
+    Split a (sanitized) message into its words for make_pretty_aprs_messages
+
+    Parameters
+    ==========
+    message_string: str
+        message string that is to be split up
+    max_len: int:
+        Max length of the list's string len.
+    non_permitted_chars: re.Pattern | None
+        Sanitizer for non-permitted APRS characters which is applied to
+        each word. The ASCII conversion may re-introduce these characters
+        (e.g. '¦' -> '|'). None = do not sanitize the words
+    utf8: bool
+        True = measure the length in UTF-8 bytes rather than in characters
+
+    Returns
+    =======
+    tokens: list
+        List of (word, force_split) tuples. force_split is True for words
+        that are too long for a single message and need to be split up
+    """
+    text_len = _get_utf8_len if utf8 else len
+    tokens = []
+    check_words = (
+        non_permitted_chars is not None
+        and non_permitted_chars.search(message_string) is not None
+    )
+    for split in message_string.split():
+        if text_len(split) >= max_len:
+            tokens.append((split, True))
+        elif check_words:
+            tokens.append((non_permitted_chars.sub("", split), False))
+        else:
+            tokens.append((split, False))
+    return tokens
+
+
+def split_string_to_string_list(message_string: str, max_len: int, utf8: bool = False):
     """
     Force-split the string into chunks of max_len size and return a list of
     strings. This function is going to be called if the string that the user
@@ -608,20 +1057,99 @@ def split_string_to_string_list(
         The length is dependent on whether the user has activated trailing
         message number information in the outgoing message or not.
         When activated, the message length is 59 - otherwise, it is 67.
-        _get_aprs_msg_len() auto-determines the appropriate value.
+        FormattingProfile.max_len holds the appropriate value.
+    utf8: bool
+        True = max_len is a budget of UTF-8 bytes. Multi-byte characters
+        are never split across two chunks
 
     Returns
     =======
     split_strings: list
         List array, containing 1..n strings with a max len of 'max_len'
     """
-    split_strings = [
-        message_string[index : index + max_len]
-        for index in range(0, len(message_string), max_len)
-    ]
+    if not utf8 or message_string.isascii():
+        split_strings = [
+            message_string[index : index + max_len]
+            for index in range(0, len(message_string), max_len)
+        ]
+        return split_strings
+
+    split_strings = []
+    while message_string:
+        chunk, message_string = _split_text_at_len(
+            message_string=message_string, max_len=max_len, utf8=True
+        )
+        if not chunk:
+            # max_len is smaller than the character; send it as is
+            chunk, message_string = message_string[0], message_string[1:]
+        split_strings.append(chunk)
     return split_strings
 
 
+def _get_utf8_len(message_string: str) -> int:
+    """
+    Returns the length of a string in UTF-8 bytes
+
+    Parameters
+    ==========
+    message_string: str
+        the string that is to be measured
+
+    Returns
+    =======
+    length: int
+        length of the UTF-8 encoded string
+    """
+    if message_string.isascii():
+        return len(message_string)
+    return len(message_string.encode("utf-8"))
+
+
+def _split_text_at_len(message_string: str, max_len: int, utf8: bool = False):
+    """
+    Splits a string into a head of max 'max_len' length and its remainder.
+    In UTF-8 mode, the head is cut at the last character boundary within
+    the byte budget; the head is empty if the first character exceeds the
+    budget on its own.
+
+    Parameters
+    ==========
+    message_string: str
+        the string that is to be split
+    max_len: int
+        max length of the head (characters or UTF-8 bytes)
+    utf8: bool
+        True = max_len is a budget of UTF-8 bytes
+
+    Returns
+    =======
+    head: str
+        the head of the string
+    tail: str
+        the remainder of the string
+    """
+    if not utf8 or message_string.isascii():
+        return message_string[:max_len], message_string[max_len:]
+
+    encoded = message_string.encode("utf-8")
+    if len(encoded) <= max_len:
+        return message_string, ""
+    cut = max_len
+    # back off while we are inside of a multi-byte sequence (continuation
+    # bytes are 0b10xxxxxx)
+    while cut > 0 and (encoded[cut] & 0xC0) == 0x80:
+        cut -= 1
+    return encoded[:cut].decode("utf-8"), encoded[cut:].decode("utf-8")
+
+
+# Bulletin identifiers: static bulletins (configuration file) support BLNxxx
+# identifiers, dynamic bulletins support both BLNxxx and NWS-xxx identifiers
+APRS_STATIC_BULLETIN_ID = re.compile(r"^bln[a-z0-9]{1,6}$", flags=re.IGNORECASE)
+APRS_DYNAMIC_BULLETIN_ID = re.compile(
+    r"^(bln[a-z0-9]{1,6})|(nws-[a-z0-9]{1,5})$", flags=re.IGNORECASE
+)
+
+
 def parse_bulletin_data():
     """
     This function parses the bulletin messages from the configuration file,
@@ -647,13 +1175,11 @@ def parse_bulletin_data():
             # Check if the identifier follows these APRS requirements:
             # 1) must start with fixed "BLN" string
             # 2) needs to be followed by 1..6 ASCII-7 characters and/or digits
-            match = re.match(
-                pattern=r"^bln[a-z0-9]{1,6}$", string=key, flags=re.IGNORECASE
-            )
+            match = APRS_STATIC_BULLETIN_ID.match(key)
             if match:
                 # We found a match. As a precaution, let's check if the user has
                 # used characters in the actual message which are special to APRS
-                match = re.findall(r"[{}|~]+", value)
+                match = APRS_NON_PERMITTED_CHARS.search(value)
                 if match:
                     # Yes, we could remove those characters straight away but the
                     # idea behind this two-fold approach is to inform the user that
@@ -662,7 +1188,7 @@ def parse_bulletin_data():
                         msg=f"APRS bulletin message '{key}': removing special APRS characters from 'value' setting; check your configuration file"
                     )
                     # Let's get rid of those control characters from the message
-                    value = re.sub(r"[{}|~]+", "", value)
+                    value = APRS_NON_PERMITTED_CHARS.sub("", value)
                 # Convert the bulletin identifier to upperkey
                 key = key.upper()
                 # and add it to our dictionary in case it does not exist
@@ -683,6 +1209,123 @@ def parse_bulletin_data():
     return aprs_bulletin_messages
 
 
+class APRSBulletinFrames:
+    def __init__(self, static_bulletins: dict, source_callsign: str, tocall: str):
+        """
+        This class implements the compiled set of APRS bulletins: the static
+        bulletins (see parse_bulletin_data) plus the user's dynamic bulletins,
+        converted to ready-to-send APRS frames. The set is only recompiled
+        whenever the version of the dynamic bulletins has changed.
+
+        Parameters
+        ==========
+        static_bulletins: dict
+           The (already validated) static bulletins.
+           Key = BLNxxx, Value = Bulletin Text
+        source_callsign: str
+           Our very own APRS callsign (e.g. COAC)
+        tocall: str
+           The bot's TOCALL
+
+        Returns
+        =======
+
+        """
+        self.static_bulletins = static_bulletins
+        self.source_callsign = source_callsign
+        self.tocall = tocall
+        self._version = None
+        self._frames: Mapping = types.MappingProxyType({})
+        self._lock = threading.Lock()
+
+    def get_frames(self, version: int, dynamic_bulletins: Mapping) -> Mapping:
+        """
+        Returns the compiled APRS bulletin frames. The frames are
+        recompiled if the dynamic bulletins' version has changed.
+
+        Parameters
+        ==========
+        version: int
+            Version of the dynamic bulletins. Needs to be retrieved _prior_
+            to retrieving the dynamic bulletins
+        dynamic_bulletins: Mapping
+            The user's dynamic bulletins. Key = BLNxxx or NWS-xxx,
+            Value = Bulletin Text
+
+        Returns
+        =======
+        frames: Mapping
+            The ready-to-send APRS bulletin frames. Key = upper case
+            bulletin identifier, Value = frame; static bulletins first
+        """
+        with self._lock:
+            if version != self._version:
+                logger.debug(msg=f"Compiling APRS bulletins (version {version})")
+                self._frames = self._compile(dynamic_bulletins=dynamic_bulletins)
+                self._version = version
+            return self._frames
+
+    def _compile(self, dynamic_bulletins: Mapping) -> Mapping:
+        """
+        Validates the dynamic bulletins, merges them with the static
+        bulletins and builds the APRS bulletin frames
+
+        Parameters
+        ==========
+        dynamic_bulletins: Mapping
+            The user's dynamic bulletins
+
+        Returns
+        =======
+        frames: Mapping
+            The ready-to-send APRS bulletin frames
+        """
+        # create our target dictionary which may contain both static
+        # and dynamic bulletin messages. First, copy the content from the static
+        # bulletin settings - we don't need to check this data again.
+        target_dict = dict(self.static_bulletins)
+
+        if type(dynamic_bulletins) is types.MappingProxyType:
+            # Get the key and value from the user's dynamic bulletins
+            for key, value in dynamic_bulletins.items():
+                # Message populated and less than max APRS message length?
+                # note: we do not use message enumeration for bulletins
+                # therefore, the max length requirement is always fixed (67 bytes)
+                if 0 < len(value) <= APRS_MSG_LEN_NOTRAILING:
+                    # Check if the identifier follows these APRS requirements:
+                    # 1) must start with fixed "BLN" string OR "NWS-" string
+                    # 2) needs to be followed by 1..6 (NWS: 1..5) ASCII-7 characters and/or digits
+                    # We do not need to look for "finalized" entries, read: the dictionary's key is
+                    # not required to have keys with 9 chars in total length
+                    if APRS_DYNAMIC_BULLETIN_ID.match(key):
+                        # We found a match. As a precaution, let's check if the user has
+                        # used characters in the actual message which are special to APRS
+                        if APRS_NON_PERMITTED_CHARS.search(value):
+                            logger.debug(
+                                msg=f"APRS dynamic bulletin message '{key}': removing special APRS characters from 'value' setting"
+                            )
+                            # Let's get rid of those control characters from the message
+                            value = APRS_NON_PERMITTED_CHARS.sub("", value)
+                        # Convert the bulletin identifier to upperkey
+                        key = key.upper()
+                        # and add it to our dictionary in case it does not exist
+                        # and its lenght (after potential character replacements)
+                        # is still greater than zero
+                        if key not in target_dict and len(value) > 0:
+                            target_dict[key] = value
+                else:
+                    logger.debug(
+                        f"Ignoring dynamic bulletin setting for '{key}'; value is either empty or exceeds {APRS_MSG_LEN_NOTRAILING} characters. Check your input data"
+                    )
+
+        return types.MappingProxyType(
+            {
+                recipient_id: f"{self.source_callsign}>{self.tocall}::{recipient_id:9}:{bln}"
+                for recipient_id, bln in target_dict.items()
+            }
+        )
+
+
 def client_exception_handler():
     """
     This function will be called in case of a regular program exit OR
@@ -784,13 +1427,17 @@ def check_for_default_config():
         )
 
 
-def format_list_with_enumeration(mylistarray: list):
+def format_list_with_enumeration(mylistarray: list, utf8: bool = False):
     """
     Adds a trailing enumeration to the list if the user has activated this configuration in
     the client's config file
 
     Parameters
     ==========
+    mylistarray: list
+        List of APRS messages
+    utf8: bool
+        True = truncate and pad the messages based on their UTF-8 byte length
 
     Returns
     =======
@@ -822,8 +1469,16 @@ def format_list_with_enumeration(mylistarray: list):
         formatted_list = []
         for i, s in enumerate(trimmed_listarray, start=1):
             annotation = f" ({i:02d}/{total:02d})"
-            truncated = s[:max_content_length]
-            padded = truncated.ljust(max_content_length)
+            if utf8:
+                truncated, _ = _split_text_at_len(
+                    message_string=s, max_len=max_content_length, utf8=True
+                )
+                padded = truncated + " " * (
+                    max_content_length - _get_utf8_len(truncated)
+                )
+            else:
+                truncated = s[:max_content_length]
+                padded = truncated.ljust(max_content_length)
             final = padded + annotation
             formatted_list.append(final)
 
@@ -833,7 +1488,360 @@ def format_list_with_enumeration(mylistarray: list):
         return trimmed_listarray
 
 
-def finalize_pretty_aprs_messages(mylistarray: list) -> list:
+def get_formatted_aprs_messages(
+    message_to_add: str, formatting_profile: FormattingProfile
+) -> tuple:
+    """
+    Converts a message string to its final APRS messages (see
+    make_pretty_aprs_messages and finalize_pretty_aprs_messages). If
+    compaction is enabled, the message string gets compacted prior to its
+    segmentation.
+
+    Parameters
+    ==========
+    message_to_add: str
+        message string that is to be sent to the user
+    formatting_profile: FormattingProfile
+        The formatting settings, see build_formatting_profile
+
+    Returns
+    =======
+    messages: tuple
+        Finalized APRS messages, ready to be sent
+    """
+    return _add_compaction_statistics(
+        message_to_add=message_to_add,
+        formatted_message=_format_aprs_messages(
+            message_to_add=message_to_add, formatting_profile=formatting_profile
+        ),
+        formatting_profile=formatting_profile,
+    )
+
+
+def _format_aprs_messages(
+    message_to_add: str, formatting_profile: FormattingProfile
+) -> tuple:
+    """
+    Compacts and segments a message string (see get_formatted_aprs_messages).
+    This function does not update the compaction statistics, meaning that
+    its results can be cached
+
+    Parameters
+    ==========
+    message_to_add: str
+        message string that is to be sent to the user
+    formatting_profile: FormattingProfile
+        The formatting settings, see build_formatting_profile
+
+    Returns
+    =======
+    messages: tuple
+        Finalized APRS messages, ready to be sent
+    compacted_message: str
+        The compacted message string
+    """
+    compactor = formatting_profile.compactor
+    compacted_message = (
+        compactor.compact(message_text=message_to_add) if compactor else message_to_add
+    )
+    messages = tuple(
+        _finalize_aprs_message_chunks(
+            message_chunks=[compacted_message],
+            mylistarray=make_pretty_aprs_messages(
+                message_to_add=compacted_message,
+                formatting_profile=formatting_profile,
+            ),
+            formatting_profile=formatting_profile,
+        )
+    )
+    return messages, compacted_message
+
+
+def _count_segments_saved(
+    message_to_add: str, compacted_segments: int, formatting_profile: FormattingProfile
+) -> int:
+    """
+    Determines the number of APRS messages that the compaction of a message
+    string has saved. As this requires a second segmentation of the
+    uncompacted message string, the compaction statistics call this function
+    only on demand (see APRSTextCompactor.add_statistics)
+
+    Parameters
+    ==========
+    message_to_add: str
+        The original (uncompacted) message string
+    compacted_segments: int
+        Number of APRS messages of the compacted message string
+    formatting_profile: FormattingProfile
+        The formatting settings, see build_formatting_profile
+
+    Returns
+    =======
+    segments_saved: int
+        Number of APRS messages that the compaction has saved
+    """
+    uncompacted_segments = len(
+        _finalize_aprs_message_chunks(
+            message_chunks=[message_to_add],
+            mylistarray=make_pretty_aprs_messages(
+                message_to_add=message_to_add,
+                formatting_profile=formatting_profile,
+            ),
+            formatting_profile=formatting_profile,
+        )
+    )
+    return uncompacted_segments - compacted_segments
+
+
+@functools.lru_cache(maxsize=FORMATTED_REPLY_CACHE_SIZE)
+def _format_static_aprs_messages(
+    message_to_add: str, formatting_profile: FormattingProfile
+) -> tuple:
+    """
+    Cached variant of _format_aprs_messages (see
+    get_formatted_static_aprs_messages)
+
+    Parameters
+    ==========
+    message_to_add: str
+        static message string that is to be sent to the user
+    formatting_profile: FormattingProfile
+        The formatting settings, see build_formatting_profile
+
+    Returns
+    =======
+    formatted_message: tuple
+        see _format_aprs_messages
+    """
+    return _format_aprs_messages(
+        message_to_add=message_to_add, formatting_profile=formatting_profile
+    )
+
+
+def _add_compaction_statistics(
+    message_to_add: str, formatted_message: tuple, formatting_profile: FormattingProfile
+) -> tuple:
+    """
+    Reports the savings of a compacted reply to the compaction statistics.
+    The number of saved APRS messages is only determined right away if the
+    debug log needs it; otherwise, it is determined when the statistics
+    are requested
+
+    Parameters
+    ==========
+    message_to_add: str
+        The original message string
+    formatted_message: tuple
+        The result of _format_aprs_messages
+    formatting_profile: FormattingProfile
+        The formatting settings, see build_formatting_profile
+
+    Returns
+    =======
+    messages: tuple
+        Finalized APRS messages, ready to be sent
+    """
+    messages, compacted_message = formatted_message
+    compactor = formatting_profile.compactor
+    if not compactor:
+        return messages
+    if compacted_message == message_to_add:
+        compactor.add_statistics(
+            message_text=message_to_add, compacted_text=compacted_message
+        )
+    elif logger.isEnabledFor(logging.DEBUG):
+        segments_saved = _count_segments_saved(
+            message_to_add=message_to_add,
+            compacted_segments=len(messages),
+            formatting_profile=formatting_profile,
+        )
+        compactor.add_statistics(
+            message_text=message_to_add,
+            compacted_text=compacted_message,
+            segments_saved=segments_saved,
+        )
+        logger.debug(
+            msg=f"Compaction saved {_get_utf8_len(message_to_add) - _get_utf8_len(compacted_message)} bytes and {segments_saved} message(s)"
+        )
+    else:
+        compactor.add_statistics(
+            message_text=message_to_add,
+            compacted_text=compacted_message,
+            count_segments_saved=functools.partial(
+                _count_segments_saved,
+                message_to_add=message_to_add,
+                compacted_segments=len(messages),
+                formatting_profile=formatting_profile,
+            ),
+        )
+    return messages
+
+
+def get_formatted_static_aprs_messages(
+    message_to_add: str, formatting_profile: FormattingProfile
+) -> tuple:
+    """
+    Variant of get_formatted_aprs_messages for static responses, e.g. the
+    default error message which is sent over and over again. The results
+    are kept in a bounded LRU cache, keyed by the message string and the
+    formatting profile. Do not use this function for dynamic content as
+    every distinct message string occupies a cache entry.
+
+    Parameters
+    ==========
+    message_to_add: str
+        static message string that is to be sent to the user
+    formatting_profile: FormattingProfile
+        The formatting settings, see build_formatting_profile
+
+    Returns
+    =======
+    messages: tuple
+        Finalized APRS messages, ready to be sent. As this object is
+        shared by all callers, it is immutable.
+    """
+    return _add_compaction_statistics(
+        message_to_add=message_to_add,
+        formatted_message=_format_static_aprs_messages(
+            message_to_add=message_to_add, formatting_profile=formatting_profile
+        ),
+        formatting_profile=formatting_profile,
+    )
+
+
+def get_formatted_reply_cache_statistics() -> dict:
+    """
+    Returns the statistics of the formatted reply cache
+    (see get_formatted_static_aprs_messages)
+
+    Parameters
+    ==========
+
+    Returns
+    =======
+    statistics: dict
+        hits, misses, current size and max size of the cache
+    """
+    cache_info = _format_static_aprs_messages.cache_info()
+    return {
+        "hits": cache_info.hits,
+        "misses": cache_info.misses,
+        "size": cache_info.currsize,
+        "max_size": cache_info.maxsize,
+    }
+
+
+def stream_pretty_aprs_messages(
+    message_chunks: Iterable[str], formatting_profile: FormattingProfile
+) -> Iterator[str]:
+    """
+    Streaming counterpart of make_pretty_aprs_messages and
+    finalize_pretty_aprs_messages. Text chunks (e.g. from an output generator
+    function which yields its content) are packed into APRS messages as they
+    arrive; each APRS message is yielded as soon as it is complete. Every
+    chunk is added like a separate make_pretty_aprs_messages call, meaning
+    that chunk boundaries act as word boundaries.
+
+    Message enumeration requires the total number of messages. If the user
+    has activated it, all chunks are collected prior to yielding the
+    (enumerated) messages. If compaction is enabled, every chunk gets
+    compacted prior to its segmentation.
+
+    Parameters
+    ==========
+    message_chunks: Iterable[str]
+        Text chunks which are to be sent to the user
+    formatting_profile: FormattingProfile
+        The formatting settings, see build_formatting_profile
+
+    Returns
+    =======
+    message: Iterator[str]
+        Finalized APRS messages, ready to be sent
+    """
+    compactor = formatting_profile.compactor
+    pending = []
+    # all chunks are collected anyway if enumeration is enabled; keep them
+    # for the single message check (see _finalize_aprs_message_chunks)
+    collected_chunks = []
+    for chunk in message_chunks:
+        if compactor and chunk:
+            compacted_chunk = compactor.compact(message_text=chunk)
+            compactor.add_statistics(message_text=chunk, compacted_text=compacted_chunk)
+            chunk = compacted_chunk
+        if not chunk:
+            continue
+        pending = make_pretty_aprs_messages(
+            message_to_add=chunk,
+            formatting_profile=formatting_profile,
+            destination_list=pending,
+        )
+        # Only the very last message may still receive content
+        if not formatting_profile.enumeration:
+            yield from pending[:-1]
+            del pending[:-1]
+        else:
+            collected_chunks.append(chunk)
+
+    yield from _finalize_aprs_message_chunks(
+        message_chunks=collected_chunks,
+        mylistarray=pending,
+        formatting_profile=formatting_profile,
+    )
+
+
+def _finalize_aprs_message_chunks(
+    message_chunks: list, mylistarray: list, formatting_profile: FormattingProfile
+) -> list:
+    """
+    Finalizes the APRS messages of one or more message strings (see
+    finalize_pretty_aprs_messages). With enumeration and optimal
+    segmentation, content which fits into a single APRS message does not
+    need an enumeration at all. In this case, the original message strings
+    are packed again with the max len of a non-enumerated message; the
+    content is sent as one message if this results in a single message.
+
+    Parameters
+    ==========
+    message_chunks: list
+        The message strings which were added to mylistarray
+    mylistarray: list
+        List of APRS messages, based on the formatting profile's max_len value
+    formatting_profile: FormattingProfile
+        The formatting settings, see build_formatting_profile
+
+    Returns
+    =======
+    listitem: list
+        Finalized APRS messages, ready to be sent
+    """
+    if (
+        formatting_profile.enumeration
+        and formatting_profile.optimal_segmentation
+        and len(mylistarray) > 1
+    ):
+        text_len = _get_utf8_len if formatting_profile.unicode_messages else len
+        # packing the same content again never reduces its length. Only
+        # repack if the content could fit into a single message at all
+        if sum(text_len(message) for message in mylistarray) <= APRS_MSG_LEN_NOTRAILING:
+            single_message = []
+            for chunk in message_chunks:
+                single_message = make_pretty_aprs_messages(
+                    message_to_add=chunk,
+                    formatting_profile=formatting_profile,
+                    destination_list=single_message,
+                    max_len=APRS_MSG_LEN_NOTRAILING,
+                )
+            if len(single_message) == 1:
+                return single_message
+    return finalize_pretty_aprs_messages(
+        mylistarray=mylistarray, formatting_profile=formatting_profile
+    )
+
+
+def finalize_pretty_aprs_messages(
+    mylistarray: list, formatting_profile: FormattingProfile
+) -> list:
     """
     Helper method which finalizes the prettified APRS messages
     and triggers the addition of the trailing message numbers (if
@@ -843,6 +1851,8 @@ def finalize_pretty_aprs_messages(mylistarray: list) -> list:
     ==========
     mylistarray: list
         List of APRS messages
+    formatting_profile: FormattingProfile
+        The formatting settings, see build_formatting_profile
 
     Returns
     =======
@@ -850,8 +1860,10 @@ def finalize_pretty_aprs_messages(mylistarray: list) -> list:
         Either formatted list (if more than one list entry was present) or
         the original list item
     """
-    if program_config["coac_client_config"]["aprs_message_enumeration"]:
-        return format_list_with_enumeration(mylistarray=mylistarray)
+    if formatting_profile.enumeration:
+        return format_list_with_enumeration(
+            mylistarray=mylistarray, utf8=formatting_profile.unicode_messages
+        )
     else:
         return mylistarray
 
@@ -0,0 +1,106 @@
+#
+# Core APRS Client
+# Benchmark: single-pass segmenter vs. the legacy recursive segmenter
+# Author: Joerg Schultze-Lutter, 2025
+#
+# Usage: python tests/benchmark_segmentation.py
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+
+from CoreAprsClient.client_utils import FormattingProfile, make_pretty_aprs_messages
+from legacy_segmentation import legacy_make_pretty_aprs_messages
+
+# Message sizes (unit of measure = bytes) and number of runs per size
+BENCHMARK_SIZES = (1024, 4096, 16384)
+BENCHMARK_RUNS = 50
+BENCHMARK_MAX_LEN = 67
+
+WORDS = (
+    "Temperature Wind Humidity Pressure Grüße aus Köln Forecast "
+    "tomorrow cloudy 12.5km/h 1013hPa https://example.com/weather?id=42"
+).split()
+
+
+def build_message(size: int) -> str:
+    """
+    Builds a random message text of (roughly) the given size
+
+    Parameters
+    ==========
+    size: int
+        Message size in characters
+
+    Returns
+    =======
+    message: str
+        The message text
+    """
+    rng = random.Random(size)
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)
+
+
+def run_benchmark():
+    """
+    Runs the benchmark and prints the mean time per call
+
+    Parameters
+    ==========
+
+    Returns
+    =======
+    """
+    formatting_profile = FormattingProfile(
+        max_len=BENCHMARK_MAX_LEN,
+        enumeration=False,
+        unicode_messages=False,
+        optimal_segmentation=False,
+        compactor=None,
+    )
+    print(f"max_len={BENCHMARK_MAX_LEN}, mean of {BENCHMARK_RUNS} runs")
+    for size in BENCHMARK_SIZES:
+        message = build_message(size=size)
+        legacy_time = timeit.timeit(
+            lambda: legacy_make_pretty_aprs_messages(
+                message_to_add=message, max_len=BENCHMARK_MAX_LEN
+            ),
+            number=BENCHMARK_RUNS,
+        )
+        single_pass_time = timeit.timeit(
+            lambda: make_pretty_aprs_messages(
+                message_to_add=message, formatting_profile=formatting_profile
+            ),
+            number=BENCHMARK_RUNS,
+        )
+        print(
+            f"{size // 1024:>3} KB: legacy {legacy_time / BENCHMARK_RUNS * 1000:.3f} ms, "
+            f"single pass {single_pass_time / BENCHMARK_RUNS * 1000:.3f} ms"
+        )
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,103 @@
+#
+# Core APRS Client
+# Test oracle: the recursive message segmenter of previous versions
+# Author: Joerg Schultze-Lutter, 2025
+#
+# make_pretty_aprs_messages used to call itself once per word. This module
+# keeps that implementation (with the program configuration replaced by
+# parameters) so that the single-pass segmenter can be compared against it
+# (see test_segmentation.py and benchmark_segmentation.py).
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+import re
+from unidecode import unidecode
+
+
+def legacy_convert_text_to_plain_ascii(message_string: str):
+    message_string = (
+        message_string.replace("Ä", "Ae")
+        .replace("Ö", "Oe")
+        .replace("Ü", "Ue")
+        .replace("ä", "ae")
+        .replace("ö", "oe")
+        .replace("ü", "ue")
+        .replace("ß", "ss")
+    )
+    return unidecode(message_string)
+
+
+def legacy_split_string_to_string_list(message_string: str, max_len: int):
+    return [
+        message_string[index : index + max_len]
+        for index in range(0, len(message_string), max_len)
+    ]
+
+
+def legacy_make_pretty_aprs_messages(
+    message_to_add: str,
+    destination_list: list = None,
+    max_len: int = 67,
+    separator_char: str = " ",
+    add_sep: bool = True,
+    unicode_messages: bool = False,
+) -> list:
+    if not destination_list:
+        destination_list = []
+
+    message_to_add = re.sub("[{}|~]+", "", message_to_add)
+
+    if not unicode_messages:
+        message_to_add = legacy_convert_text_to_plain_ascii(
+            message_string=message_to_add
+        )
+
+    if len(message_to_add) > max_len:
+        split_data = message_to_add.split()
+        for split in split_data:
+            if len(split) < max_len:
+                destination_list = legacy_make_pretty_aprs_messages(
+                    message_to_add=split,
+                    destination_list=destination_list,
+                    max_len=max_len,
+                    separator_char=separator_char,
+                    add_sep=add_sep,
+                    unicode_messages=unicode_messages,
+                )
+            else:
+                string_list = legacy_split_string_to_string_list(
+                    message_string=split, max_len=max_len
+                )
+                for msg in string_list:
+                    destination_list.append(msg)
+    else:
+        if len(destination_list) > 0:
+            string_from_list = destination_list[-1]
+            if len(string_from_list) + len(message_to_add) + 1 <= max_len:
+                delimiter = ""
+                if len(string_from_list) > 0 and add_sep:
+                    delimiter = separator_char
+                string_from_list = string_from_list + delimiter + message_to_add
+                destination_list[-1] = string_from_list
+            else:
+                destination_list.append(message_to_add)
+        else:
+            destination_list.append(message_to_add)
+
+    return destination_list
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,67 @@
+#
+# Core APRS Client
+# Tests for the compaction of outgoing APRS message texts
+# Author: Joerg Schultze-Lutter, 2025
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+from CoreAprsClient import client_compaction
+from CoreAprsClient.client_compaction import APRSTextCompactor
+
+
+def make_compactor() -> APRSTextCompactor:
+    return APRSTextCompactor(
+        abbreviations={"temperature": "temp"},
+        collapse_whitespace=True,
+        compact_numbers=True,
+    )
+
+
+def test_saved_segments_are_counted_on_demand():
+    compactor = make_compactor()
+    calls = []
+
+    def count_segments_saved() -> int:
+        calls.append(1)
+        return 2
+
+    compactor.add_statistics(
+        message_text="temperature 12.50 km",
+        compacted_text="temp 12.5km",
+        count_segments_saved=count_segments_saved,
+    )
+    assert not calls
+
+    statistics = compactor.get_statistics()
+    assert len(calls) == 1
+    assert statistics["compacted_replies"] == 1
+    assert statistics["segments_saved"] == 2
+
+    # already counted replies must not be counted again
+    assert compactor.get_statistics()["segments_saved"] == 2
+    assert len(calls) == 1
+
+
+def test_pending_replies_are_bounded(monkeypatch):
+    monkeypatch.setattr(client_compaction, "APRS_COMPACTION_MAX_PENDING_REPLIES", 2)
+    compactor = make_compactor()
+    for _ in range(5):
+        compactor.add_statistics(
+            message_text="temperature",
+            compacted_text="temp",
+            count_segments_saved=lambda: 1,
+        )
+    assert len(compactor._pending_segments_saved) == 2
+    assert compactor.get_statistics()["segments_saved"] == 5
@@ -0,0 +1,128 @@
+#
+# Core APRS Client
+# Tests for the APRS message dupe cache
+# Author: Joerg Schultze-Lutter, 2025
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+import sys
+import threading
+import pytest
+from CoreAprsClient import client_expdict
+from CoreAprsClient.client_expdict import (
+    MESSAGE_COMPLETED,
+    APRSMessageCache,
+    TimeWheelDupeStore,
+)
+
+TTL = 3600
+
+
+class FakeClock:
+    """
+    Replacement for the 'time' module of client_expdict
+    """
+
+    def __init__(self, now: float):
+        self.now = now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        # wall clock time runs in parallel to the monotonic clock
+        return self.now + 1_000_000.0
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake_clock = FakeClock(now=1059.9)
+    monkeypatch.setattr(client_expdict, "time", fake_clock)
+    return fake_clock
+
+
+def test_entry_lives_for_at_least_its_ttl(clock):
+    store = TimeWheelDupeStore(max_len=10, max_age_seconds=TTL)
+    store.set(key=1, state=MESSAGE_COMPLETED)
+    inserted = clock.now
+
+    # the insertion time is truncated to the start of its bucket; the
+    # entry must still be present right before its TTL has passed
+    clock.now = inserted + TTL - 0.1
+    assert 1 in store
+    assert store.age(key=1) is not None
+    store.expire()
+    assert 1 in store
+
+    # ... and gone no later than two bucket widths after its TTL
+    clock.now = inserted + TTL + 2 * TTL / client_expdict.TIME_WHEEL_BUCKETS
+    assert 1 not in store
+    assert store.age(key=1) is None
+    store.expire()
+    assert len(store) == 0
+
+
+def test_restored_entry_lives_for_at_least_its_ttl(clock):
+    store = TimeWheelDupeStore(max_len=10, max_age_seconds=TTL)
+    set_time = clock.time()
+    clock.now += TTL - 0.1
+    store.set(key=1, state=MESSAGE_COMPLETED, set_time=set_time)
+    assert 1 in store
+
+    clock.now += 0.2 + 2 * TTL / client_expdict.TIME_WHEEL_BUCKETS
+    assert 1 not in store
+
+
+def test_max_len_is_enforced_across_concurrent_shards():
+    # switch threads as often as possible
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    cache = APRSMessageCache(max_len=50, max_age_seconds=TTL, shards=8)
+    barrier = threading.Barrier(8)
+
+    def worker(offset: int):
+        barrier.wait()
+        for key in range(offset, offset + 5000, 8):
+            cache.seen_or_claim(key)
+            cache.confirm(key)
+
+    threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(8)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+    assert len(cache) == 50
+
+
+def test_confirm_after_eviction_respects_max_len():
+    # even keys map to the first shard, odd keys to the second one
+    cache = APRSMessageCache(max_len=2, max_age_seconds=TTL, shards=2)
+    assert not cache.seen_or_claim(0)
+    assert not cache.seen_or_claim(2)
+    # the second shard is empty and takes the room from the first one
+    assert not cache.seen_or_claim(1)
+    assert 0 not in cache
+    assert not cache.seen_or_claim(3)
+    cache.release(2)
+    assert not cache.seen_or_claim(5)
+
+    # the first shard is empty now; confirming the evicted claim must
+    # not push the cache past max_len
+    cache.confirm(0)
+    assert 0 in cache
+    assert len(cache) == 2
@@ -0,0 +1,79 @@
+#
+# Core APRS Client
+# Tests for the APRS message counter and its state file
+# Author: Joerg Schultze-Lutter, 2025
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+import multiprocessing
+import pytest
+from CoreAprsClient import client_state_file
+from CoreAprsClient.client_message_counter import APRSMessageCounter
+from CoreAprsClient.client_state_file import APRSStateFile
+
+ALLOCATIONS = 200
+
+
+def open_counter(file_name: str, per_destination: bool = False) -> APRSMessageCounter:
+    return APRSMessageCounter(
+        state_file=APRSStateFile(file_name=file_name),
+        per_destination=per_destination,
+    )
+
+
+def allocate_counters(file_name: str, queue: multiprocessing.Queue):
+    counter = open_counter(file_name=file_name)
+    queue.put([counter.allocate(count=2) for _ in range(ALLOCATIONS)])
+    counter.state_file.close()
+
+
+def test_counter_is_shared_by_state_file_instances(tmp_path):
+    file_name = str(tmp_path / "state.bin")
+    first = open_counter(file_name=file_name, per_destination=True)
+    second = open_counter(file_name=file_name, per_destination=True)
+
+    assert first.allocate(count=3, destination="DF1JSL-1") == 0
+    assert second.allocate(count=1) == 3
+    assert second.allocate(count=2, destination="DF1JSL-1") == 3
+    assert first.allocate(count=1, destination="DF1JSL-1") == 5
+
+    # slots which other instances have reassigned are picked up
+    first.state_file.set_slot(index=0, callsign=None)
+    first.state_file.set_slot(index=5, callsign="DF1JSL-1", value=40)
+    assert second.allocate(count=1, destination="DF1JSL-1") == 40
+    assert first.allocate(count=1, destination="DF1JSL-1") == 41
+
+
+@pytest.mark.skipif(
+    client_state_file.fcntl is None, reason="file locks are not supported"
+)
+def test_concurrent_processes_never_share_message_numbers(tmp_path):
+    file_name = str(tmp_path / "state.bin")
+    open_counter(file_name=file_name).state_file.close()
+
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    processes = [
+        context.Process(target=allocate_counters, args=(file_name, queue))
+        for _ in range(4)
+    ]
+    for process in processes:
+        process.start()
+    first_counters = [counter for _ in processes for counter in queue.get()]
+    for process in processes:
+        process.join()
+
+    assert len(set(first_counters)) == len(processes) * ALLOCATIONS
+    assert max(first_counters) == 2 * (len(processes) * ALLOCATIONS - 1)
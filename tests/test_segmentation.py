@@ -0,0 +1,112 @@
+#
+# Core APRS Client
+# Tests for the segmentation of outgoing APRS messages
+# Author: Joerg Schultze-Lutter, 2025
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+import string
+from hypothesis import given, settings, strategies as st
+from CoreAprsClient.client_utils import FormattingProfile, make_pretty_aprs_messages
+from legacy_segmentation import legacy_make_pretty_aprs_messages
+
+ASCII_CHARS = string.ascii_letters + string.digits + ".,:;!?-/()'"
+# non-permitted APRS characters, umlauts and characters which the ASCII
+# conversion turns into non-permitted characters (U+00A6 -> '|')
+SPECIAL_CHARS = "{}|~äöüÄÖÜß¦éñ"
+WHITESPACE = [" ", "  ", "\t", " \n "]
+
+max_lengths = st.sampled_from([5, 10, 59, 67])
+separators = st.sampled_from([" ", ",", "/"])
+
+
+def _messages(alphabet: str):
+    words = st.text(alphabet=alphabet, min_size=0, max_size=80)
+    return st.lists(
+        st.tuples(words, st.sampled_from(WHITESPACE)), min_size=0, max_size=40
+    ).map(lambda parts: "".join(word + space for word, space in parts))
+
+
+def _destination_lists(alphabet: str):
+    return st.lists(st.text(alphabet=alphabet, min_size=0, max_size=67), max_size=3)
+
+
+def _formatting_profile(max_len: int, unicode_messages: bool) -> FormattingProfile:
+    return FormattingProfile(
+        max_len=max_len,
+        enumeration=False,
+        unicode_messages=unicode_messages,
+        optimal_segmentation=False,
+        compactor=None,
+    )
+
+
+@settings(max_examples=1000, deadline=None)
+@given(
+    message=_messages(alphabet=ASCII_CHARS + SPECIAL_CHARS),
+    destination_list=_destination_lists(alphabet=ASCII_CHARS),
+    max_len=max_lengths,
+    separator_char=separators,
+    add_sep=st.booleans(),
+)
+def test_single_pass_segmenter_matches_legacy_segmenter(
+    message, destination_list, max_len, separator_char, add_sep
+):
+    expected = legacy_make_pretty_aprs_messages(
+        message_to_add=message,
+        destination_list=list(destination_list),
+        max_len=max_len,
+        separator_char=separator_char,
+        add_sep=add_sep,
+    )
+    actual = make_pretty_aprs_messages(
+        message_to_add=message,
+        formatting_profile=_formatting_profile(max_len=max_len, unicode_messages=False),
+        destination_list=list(destination_list),
+        separator_char=separator_char,
+        add_sep=add_sep,
+    )
+    assert actual == expected
+
+
+# Unicode messages are measured in UTF-8 bytes, whereas the legacy
+# segmenter counted characters. Both only match for ASCII content
+@settings(max_examples=500, deadline=None)
+@given(
+    message=_messages(alphabet=ASCII_CHARS + "{}|~"),
+    destination_list=_destination_lists(alphabet=ASCII_CHARS),
+    max_len=max_lengths,
+    separator_char=separators,
+    add_sep=st.booleans(),
+)
+def test_single_pass_segmenter_matches_legacy_segmenter_unicode(
+    message, destination_list, max_len, separator_char, add_sep
+):
+    expected = legacy_make_pretty_aprs_messages(
+        message_to_add=message,
+        destination_list=list(destination_list),
+        max_len=max_len,
+        separator_char=separator_char,
+        add_sep=add_sep,
+        unicode_messages=True,
+    )
+    actual = make_pretty_aprs_messages(
+        message_to_add=message,
+        formatting_profile=_formatting_profile(max_len=max_len, unicode_messages=True),
+        destination_list=list(destination_list),
+        separator_char=separator_char,
+        add_sep=add_sep,
+    )
+    assert actual == expected